@@ -1,13 +1,25 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import altair as alt
-from collections import defaultdict
 import time
 import io
 import base64
-import math
 import os # Pastikan ini diimpor untuk operasi file
+import html
+
+from db import CATALOG_TABLES, CatalogValidationError, import_catalog_rows, open_catalog_store, read_catalog_rows
+from system import (
+    ASSIGNMENT_STRATEGIES,
+    CompiledCatalog,
+    SimulationResultCache,
+    assign_tasks,
+    build_scenario_grid,
+    catalog_content_hash,
+    compute_worker_stats,
+    format_time,
+    run_scenario_sweep,
+    simulation_cache_key,
+)
 
 # Set page configuration
 st.set_page_config(
@@ -105,162 +117,62 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- Data Models for Simulation ---
-class TaskSimulationData:
-    def __init__(self, product_row):
-        self.product = product_row["Product"]
-        self.description = product_row["Task"]
-        self.task_id = product_row["Result"]
-        # Handle NaN requirements gracefully
-        requirements_str = str(product_row["Requirements"])
-        if pd.isna(product_row["Requirements"]) or requirements_str.lower() == "nan":
-            self.requirements = []
-        else:
-            self.requirements = [req.strip() for req in requirements_str.split(",") if req.strip()]
-        
-        self.skill_requirements = {
-            "Bending": product_row["Bending"] / 100, 
-            "Gluing": product_row["Gluing"] / 100,
-            "Assembling": product_row["Assembling"] / 100,
-            "EdgeScrap": product_row["EdgeScrap"] / 100,
-            "OpenPaper": product_row["OpenPaper"] / 100,
-            "QualityControl": product_row["QualityControl"] / 100,
-        }
-        self.duration_slot = product_row["DurationSlot"]
-
-    def __repr__(self):
-        return f"TaskSimData(ID={self.task_id}, Product={self.product}, Req={self.requirements})"
-
-class WorkerSimulationData:
-    def __init__(self, worker_row):
-        self.name = worker_row["Worker"]
-        self.skills = {
-            "Bending": worker_row["Bending"],
-            "Gluing": worker_row["Gluing"],
-            "Assembling": worker_row["Assembling"],
-            "EdgeScrap": worker_row["EdgeScrap"],
-            "OpenPaper": worker_row["OpenPaper"],
-            "QualityControl": worker_row["QualityControl"],
-        }
-        # Handle potential NaN in favorite products
-        self.favorite_products = [
-            str(worker_row["FavoriteProduct1"]) if pd.notna(worker_row["FavoriteProduct1"]) else "",
-            str(worker_row["FavoriteProduct2"]) if pd.notna(worker_row["FavoriteProduct2"]) else "",
-            str(worker_row["FavoriteProduct3"]) if pd.notna(worker_row["FavoriteProduct3"]) else ""
-        ]
-        
-        # Simulation state
-        self.is_available = True
-        self.current_task_instance = None
-        self.time_remaining_on_task = 0
-        self.expected_completion_time = 0
-        self.task_history = []
-        self.is_aggressive = False
-        self.aggressiveness_factor = np.random.uniform(0.2, 0.8)
-        self.progression_score = 0
-        self.completed_products_count = defaultdict(int)
-        self.total_tasks_completed_units = 0
-        self.skill_utilization_score = 0
-        self.time_spent_on_product = defaultdict(int)
-        self.current_product_focus = None
-        
-    def __repr__(self):
-        return f"WorkerSimData(Name={self.name}, Available={self.is_available})"
-
-class TaskInstance:
-    def __init__(self, task_sim_data, instance_idx):
-        self.task_sim_data = task_sim_data
-        self.instance_id = f"{task_sim_data.task_id}_U{instance_idx}"
-        self.product = task_sim_data.product
-        self.task_id = task_sim_data.task_id
-        self.description = task_sim_data.description
-        self.requirements = task_sim_data.requirements
-        self.skill_requirements = task_sim_data.skill_requirements
-        self.duration_slot = task_sim_data.duration_slot
-        
-        self.status = "pending"
-        self.progress_percentage = 0.0
-        self.assigned_worker_name = None
-        self.start_time_minutes = None
-        self.completion_time_minutes = None
-        self.assigned_history = []
-        
-    def __repr__(self):
-        return f"TaskInstance(ID={self.instance_id}, TaskType={self.task_id}, Status={self.status}, Progress={self.progress_percentage:.1f}%)"
+@st.cache_resource(max_entries=4)
+def get_compiled_catalog(content_hash, _products_df):
+    """Compiled catalog shared by all runs and sessions for one version of products.csv"""
+    return CompiledCatalog(_products_df, content_hash)
+
+@st.cache_resource
+def get_result_cache():
+    """Simulation results shared by all sessions; SIMULATION_CACHE_DIR adds an on-disk tier"""
+    return SimulationResultCache(max_entries=16, cache_dir=os.environ.get("SIMULATION_CACHE_DIR") or None)
 
 # --- Data Loading (Diperbarui untuk membuat file jika tidak ada) ---
-@st.cache_data
-def load_data():
-    """Memuat data dari file CSV di direktori yang sama.
-    Akan membuat file CSV kosong jika tidak ditemukan.
+@st.cache_resource
+def get_catalog_store():
+    """Penyimpanan katalog: database SQLite jika CATALOG_DB diset, direktori kolom .npy jika
+    CATALOG_DIR diset, selain itu file CSV"""
+    return open_catalog_store()
+
+@st.cache_resource(max_entries=8)
+def load_catalog_table(table, version):
+    """Memuat satu tabel katalog ("workers" atau "products").
+    Versi tabel (mtime file CSV, penghitung di SQLite atau generasi direktori .npy) menjadi bagian
+    dari kunci cache, sehingga perubahan pada satu tabel hanya membuat tabel itu dibaca ulang.
+    DataFrame dibagi ke semua sesi tanpa disalin (kolom .npy tetap di-memory-map), jadi tidak
+    boleh diubah. Backend CSV akan membuat file CSV kosong jika tidak ditemukan.
     """
+    return get_catalog_store().load(table)
+
+def load_workers():
+    store = get_catalog_store()
+    return load_catalog_table("workers", store.version("workers"))
+
+def load_products():
+    store = get_catalog_store()
+    return load_catalog_table("products", store.version("products"))
+
+def load_data():
+    """Memuat data pekerja dan produk dari penyimpanan katalog"""
     try:
-        # Muat data pekerja
-        if os.path.exists("workers.csv"):
-            workers_df = pd.read_csv("workers.csv")
-        else:
-            # Buat file pekerja default jika tidak ada
-            workers_df = pd.DataFrame(columns=[
-                "Worker", "Bending", "Gluing", "Assembling", "EdgeScrap",
-                "OpenPaper", "QualityControl", "FavoriteProduct1",
-                "FavoriteProduct2", "FavoriteProduct3"
-            ])
-            workers_df.to_csv("workers.csv", index=False)
-        
-        # Muat data produk
-        if os.path.exists("products.csv"):
-            products_df = pd.read_csv("products.csv")
-        else:
-            # Buat file produk default jika tidak ada
-            products_df = pd.DataFrame(columns=[
-                "Product", "Task", "Result", "Requirements", "Bending", 
-                "Gluing", "Assembling", "EdgeScrap", "OpenPaper", 
-                "QualityControl", "DurationSlot"
-            ])
-            products_df.to_csv("products.csv", index=False)
-            
-        return workers_df, products_df
+        return load_workers(), load_products()
     except Exception as e:
         st.error(f"Error memuat data: {e}")
         st.stop()
 
 # --- Fungsi CRUD (Logika Data) ---
-def save_workers_data(workers_df_to_save):
-    """Menyimpan data pekerja ke CSV"""
-    try:
-        workers_df_to_save.to_csv("workers.csv", index=False)
-        st.cache_data.clear() # Hapus cache data setelah perubahan
-        return True
-    except Exception as e:
-        st.error(f"Error menyimpan data pekerja: {e}")
-        return False
-
-def save_products_data(products_df_to_save):
-    """Menyimpan data produk ke CSV"""
-    try:
-        products_df_to_save.to_csv("products.csv", index=False)
-        st.cache_data.clear() # Hapus cache data setelah perubahan
-        return True
-    except Exception as e:
-        st.error(f"Error menyimpan data produk: {e}")
-        return False
-
+# Setiap operasi hanya menulis satu baris di penyimpanan; versi tabel ikut berubah,
+# jadi hanya cache tabel tersebut yang dimuat ulang
 def add_worker(current_workers_df, worker_data):
-    """Menambahkan pekerja baru ke dataframe"""
+    """Menambahkan pekerja baru"""
     try:
         # Periksa apakah pekerja sudah ada
         if worker_data["Worker"] in current_workers_df["Worker"].values:
             return False, "Pekerja dengan nama ini sudah ada!"
         
         # Tambahkan pekerja baru
-        new_worker_df = pd.DataFrame([worker_data])
-        updated_df = pd.concat([current_workers_df, new_worker_df], ignore_index=True)
-        
-        # Simpan ke CSV
-        if save_workers_data(updated_df):
-            return True, "Pekerja berhasil ditambahkan!"
-        else:
-            return False, "Gagal menyimpan data pekerja!"
+        get_catalog_store().insert("workers", worker_data)
+        return True, "Pekerja berhasil ditambahkan!"
             
     except Exception as e:
         return False, f"Error menambahkan pekerja: {e}"
@@ -268,466 +180,166 @@ def add_worker(current_workers_df, worker_data):
 def update_worker(current_workers_df, old_name, worker_data):
     """Memperbarui pekerja yang sudah ada"""
     try:
-        # Temukan indeks pekerja
-        worker_index = current_workers_df[current_workers_df["Worker"] == old_name].index
-        
-        if len(worker_index) == 0:
+        if not get_catalog_store().update("workers", old_name, worker_data):
             return False, "Pekerja tidak ditemukan!"
-        
-        # Update worker data
-        for col, value in worker_data.items():
-            current_workers_df.loc[worker_index[0], col] = value
-        
-        # Simpan ke CSV
-        if save_workers_data(current_workers_df):
-            return True, "Pekerja berhasil diperbarui!"
-        else:
-            return False, "Gagal menyimpan data pekerja!"
+        return True, "Pekerja berhasil diperbarui!"
             
     except Exception as e:
         return False, f"Error memperbarui pekerja: {e}"
 
 def delete_worker(current_workers_df, worker_name):
-    """Menghapus pekerja dari dataframe"""
+    """Menghapus pekerja"""
     try:
-        # Check if worker exists
-        if worker_name not in current_workers_df["Worker"].values:
+        if not get_catalog_store().delete("workers", worker_name):
             return False, "Pekerja tidak ditemukan!"
-        
-        # Remove worker
-        updated_df = current_workers_df[current_workers_df["Worker"] != worker_name].reset_index(drop=True)
-        
-        # Save to CSV
-        if save_workers_data(updated_df):
-            return True, "Pekerja berhasil dihapus!"
-        else:
-            return False, "Gagal menyimpan data pekerja!"
+        return True, "Pekerja berhasil dihapus!"
             
     except Exception as e:
         return False, f"Error menghapus pekerja: {e}"
 
 def add_product(current_products_df, product_data):
-    """Menambahkan produk baru ke dataframe"""
+    """Menambahkan tugas produk baru"""
     try:
         # Periksa apakah ID hasil produk sudah ada
         if product_data["Result"] in current_products_df["Result"].values:
             return False, "Tugas produk dengan ID Hasil ini sudah ada!"
         
         # Tambahkan produk baru
-        new_product_df = pd.DataFrame([product_data])
-        updated_df = pd.concat([current_products_df, new_product_df], ignore_index=True)
-        
-        # Simpan ke CSV
-        if save_products_data(updated_df):
-            return True, "Tugas produk berhasil ditambahkan!"
-        else:
-            return False, "Gagal menyimpan data produk!"
+        get_catalog_store().insert("products", product_data)
+        return True, "Tugas produk berhasil ditambahkan!"
             
     except Exception as e:
         return False, f"Error menambahkan produk: {e}"
 
 def update_product(current_products_df, old_result_id, product_data):
-    """Memperbarui produk yang sudah ada"""
+    """Memperbarui tugas produk yang sudah ada"""
     try:
-        # Temukan indeks produk
-        product_index = current_products_df[current_products_df["Result"] == old_result_id].index
-        
-        if len(product_index) == 0:
+        if not get_catalog_store().update("products", old_result_id, product_data):
             return False, "Tugas produk tidak ditemukan!"
-        
-        # Perbarui data produk
-        for col, value in product_data.items():
-            current_products_df.loc[product_index[0], col] = value
-        
-        # Simpan ke CSV
-        if save_products_data(current_products_df):
-            return True, "Tugas produk berhasil diperbarui!"
-        else:
-            return False, "Gagal menyimpan data produk!"
+        return True, "Tugas produk berhasil diperbarui!"
             
     except Exception as e:
         return False, f"Error memperbarui produk: {e}"
 
 def delete_product(current_products_df, result_id):
-    """Menghapus produk dari dataframe"""
+    """Menghapus tugas produk"""
     try:
-        # Periksa apakah produk ada
-        if result_id not in current_products_df["Result"].values:
+        if not get_catalog_store().delete("products", result_id):
             return False, "Tugas produk tidak ditemukan!"
-        
-        # Hapus produk
-        updated_df = current_products_df[current_products_df["Result"] != result_id].reset_index(drop=True)
-        
-        # Simpan ke CSV
-        if save_products_data(updated_df):
-            return True, "Tugas produk berhasil dihapus!"
-        else:
-            return False, "Gagal menyimpan data produk!"
+        return True, "Tugas produk berhasil dihapus!"
             
     except Exception as e:
         return False, f"Error menghapus produk: {e}"
 
-# Helper functions
-def calculate_skill_match(worker_skills, task_skill_requirements):
-    """Calculate skill match score between worker and task"""
-    total_score = 0
-    num_relevant_skills = 0
-    
-    for skill_type, required_ratio in task_skill_requirements.items():
-        if required_ratio > 0:
-            worker_skill = worker_skills.get(skill_type, 0)
-            score = worker_skill / max(0.01, required_ratio)
-            total_score += score
-            num_relevant_skills += 1
-            
-    return total_score / num_relevant_skills if num_relevant_skills > 0 else 0.1
-
-def format_time(minutes):
-    """Convert simulation minutes to HH:MM format"""
-    hours_from_start = minutes // 60
-    mins_past_hour = minutes % 60
-    display_hour = 8 + hours_from_start
-    return f"{int(display_hour):02d}:{int(mins_past_hour):02d}"
-
-def get_task_group(task_id):
-    """Returns a generic task group ID (e.g., 'ST1' and 'SL1' both map to 'T1')"""
-    if task_id.startswith("ST"):
-        return f"T{task_id[2:]}"
-    elif task_id.startswith("SL"):
-        return f"T{task_id[2:]}"
-    elif task_id.startswith("BH"):
-        return f"T{task_id[2:]}"
-    return task_id # Fallback for other task IDs
-
-def check_requirements_met(task_instance, inventory, partial_completions):
-    """Check if task requirements are met, considering interchangeable requirements"""
-    # ST1, SL1, BH1 tasks have no requirements - they can always start
-    if not task_instance.requirements:
-        return True
-    
-    for req_task_id in task_instance.requirements:
-        # Check if any task from the same group as req_task_id has completed units or significant progress
-        req_task_group = get_task_group(req_task_id)
-        
-        met_by_group = False
-        for inv_task_id, completed_units in inventory.items():
-            if get_task_group(inv_task_id) == req_task_group and completed_units >= 1:
-                met_by_group = True
-                break
-        
-        if not met_by_group:
-            for pc in partial_completions:
-                if get_task_group(pc["task_id"]) == req_task_group and pc["progress_percentage"] >= 50.0:
-                    met_by_group = True
-                    break
-        
-        if not met_by_group:
-            return False
-    return True
-
-def get_earliest_available_tasks(all_task_instances, inventory, partial_completions):
-    """Get earliest tasks that can be started (prioritizing tasks with no requirements)"""
-    earliest_tasks = []
-    for task_instance in all_task_instances:
-        if task_instance.status == "pending" and not task_instance.requirements:
-            earliest_tasks.append(task_instance)
-    return earliest_tasks
-
-def get_available_tasks(all_task_instances, inventory, partial_completions):
-    """Get all tasks that can be started based on requirements"""
-    available_tasks = []
-    for task_instance in all_task_instances:
-        if task_instance.status == "pending" and check_requirements_met(task_instance, inventory, partial_completions):
-            available_tasks.append(task_instance)
-    return available_tasks
-
-def prioritize_tasks_for_flow(all_available_tasks, earliest_tasks, all_task_instances, inventory, partial_completions):
-    """Prioritize tasks to optimize production flow and worker transitions"""
-    prioritized_tasks = []
-    
-    # 1. Prioritize tasks that are earliest (no requirements)
-    prioritized_tasks.extend(sorted(earliest_tasks, key=lambda t: t.task_id))
-    
-    # 2. Add other available tasks that can enable progression
-    other_tasks = [t for t in all_available_tasks if t not in earliest_tasks]
-    prioritized_tasks.extend(sorted(other_tasks, key=lambda t: (len(t.requirements), t.task_id)))
-    
-    return prioritized_tasks
-
-def assign_worker_to_task(worker, task, current_time_minutes, slot_duration_minutes):
-    """Assign a worker to a task"""
-    worker.is_available = False
-    worker.current_task_instance = task
-    worker.time_remaining_on_task = task.duration_slot * slot_duration_minutes
-    
-    task.status = "in_progress"
-    task.assigned_worker_name = worker.name
-    task.start_time_minutes = current_time_minutes
-
-# --- Core Scheduling Logic ---
-def assign_tasks(products_to_produce, available_workers_df, products_df, slot_duration_minutes=30):
-    """Enhanced task assignment with dynamic worker transitions and interchangeable requirements"""
+def import_catalog_file(table, uploaded_file):
+    """Mengimpor banyak baris sekaligus dari file CSV/JSONL yang diunggah.
+    Semua baris divalidasi lebih dulu lalu disimpan dalam satu kali tulis; jika ada baris yang
+    tidak valid, tidak ada yang disimpan.
+    """
     try:
-        # Initialize simulation data structures
-        task_sim_data_map = {row["Result"]: TaskSimulationData(row) for _, row in products_df.iterrows()}
-        worker_sim_data_map = {row["Worker"]: WorkerSimulationData(row) for _, row in available_workers_df.iterrows()}
-        
-        # Generate unique TaskInstance objects
-        all_task_instances = []
-        instance_counter = defaultdict(int)
-        
-        for product_name, quantity in products_to_produce.items():
-            product_tasks = products_df[products_df["Product"] == product_name].sort_values(by="Result")
-            for unit_idx in range(quantity):
-                for _, task_row in product_tasks.iterrows():
-                    task_sim_data = task_sim_data_map[task_row["Result"]]
-                    instance_counter[task_sim_data.task_id] += 1
-                    task_instance = TaskInstance(task_sim_data, instance_counter[task_sim_data.task_id])
-                    all_task_instances.append(task_instance)
-        
-        # Filter tasks for selected products
-        all_task_instances = [ti for ti in all_task_instances if ti.product in products_to_produce]
-
-        # Calculate simulation parameters
-        total_task_slots = sum(ti.duration_slot for ti in all_task_instances)
-        total_worker_slots_per_day = len(available_workers_df) * (8 * 60 / slot_duration_minutes)
-        estimated_days = max(1, math.ceil(total_task_slots / total_worker_slots_per_day))
-        
-        # Simulation state
-        current_time_minutes = 0
-        max_simulation_time = estimated_days * 8 * 60  # 8 hours per day
-        inventory = defaultdict(int)
-        partial_completions = []
-        
-        # Schedule tracking
-        schedule = defaultdict(lambda: defaultdict(lambda: defaultdict(str)))
-        simulation_log = []
-        
-        # Main simulation loop
-        while current_time_minutes < max_simulation_time:
-            current_day = current_time_minutes // (8 * 60) + 1
-            current_slot = (current_time_minutes % (8 * 60)) // slot_duration_minutes
-            
-            # Update worker progress
-            for worker_name, worker_data in worker_sim_data_map.items():
-                if not worker_data.is_available and worker_data.current_task_instance:
-                    worker_data.time_remaining_on_task -= slot_duration_minutes
-                    
-                    # Update task progress
-                    task_instance = worker_data.current_task_instance
-                    progress_increment = 100 / task_instance.duration_slot
-                    task_instance.progress_percentage = min(100, task_instance.progress_percentage + progress_increment)
-                    
-                    # Check if task is completed
-                    if worker_data.time_remaining_on_task <= 0:
-                        task_instance.status = "completed"
-                        task_instance.completion_time_minutes = current_time_minutes
-                        inventory[task_instance.task_id] += 1
-                        
-                        worker_data.is_available = True
-                        worker_data.current_task_instance = None
-                        worker_data.time_remaining_on_task = 0
-                        
-                        simulation_log.append({
-                            "time": format_time(current_time_minutes),
-                            "event": f"Worker {worker_name} completed {task_instance.instance_id}"
-                        })
-            
-            # Get available workers and tasks
-            available_workers = [w for w in worker_sim_data_map.values() if w.is_available]
-            
-            # Get earliest tasks (no requirements) and all available tasks
-            earliest_tasks = get_earliest_available_tasks(all_task_instances, inventory, partial_completions)
-            all_available_tasks = get_available_tasks(all_task_instances, inventory, partial_completions)
-            
-            # Prioritize tasks for optimal flow
-            prioritized_tasks = prioritize_tasks_for_flow(all_available_tasks, earliest_tasks, all_task_instances, inventory, partial_completions)
-            
-            # Enhanced assignment logic with smart worker distribution
-            # Step 1: Identify task progression opportunities
-            task_progression_map = {}
-            for task in all_available_tasks:
-                task_level = len(task.requirements)
-                if task_level not in task_progression_map:
-                    task_progression_map[task_level] = []
-                task_progression_map[task_level].append(task)
-            
-            # Step 2: Smart worker assignment based on progression strategy
-            assigned_workers = set()
-            
-            # Priority 1: Ensure earliest tasks (level 0) have sufficient workers
-            level_0_tasks = task_progression_map.get(0, [])
-            if level_0_tasks:
-                workers_for_level_0 = max(1, len(available_workers) // 2)  # At least half workers on earliest tasks
-                for i, task in enumerate(level_0_tasks[:workers_for_level_0]):
-                    if i < len(available_workers):
-                        worker = available_workers[i]
-                        assign_worker_to_task(worker, task, current_time_minutes, slot_duration_minutes)
-                        assigned_workers.add(worker.name)
-                        
-                        simulation_log.append({
-                            "time": format_time(current_time_minutes),
-                            "event": f"Worker {worker.name} started {task.instance_id} (earliest task priority)"
-                        })
-            
-            # Priority 2: Assign remaining workers to highest available task level
-            remaining_workers = [w for w in available_workers if w.name not in assigned_workers]
-            
-            # Find highest task level that has available tasks
-            max_level = max(task_progression_map.keys()) if task_progression_map else 0
-            
-            for level in range(max_level, -1, -1):
-                if level in task_progression_map and remaining_workers:
-                    level_tasks = task_progression_map[level]
-                    
-                    # Assign workers to this level, but leave some for lower levels if needed
-                    if level > 0:
-                        # For higher levels, assign fewer workers to maintain balance
-                        workers_for_this_level = min(len(remaining_workers) // 2, len(level_tasks))
-                    else:
-                        # For level 0, assign all remaining workers
-                        workers_for_this_level = min(len(remaining_workers), len(level_tasks))
-                    
-                    for i in range(workers_for_this_level):
-                        if i < len(level_tasks) and i < len(remaining_workers):
-                            worker = remaining_workers[i]
-                            task = level_tasks[i]
-                            
-                            # Check skill match
-                            skill_score = calculate_skill_match(worker.skills, task.skill_requirements)
-                            favorite_bonus = 1.2 if task.product in worker.favorite_products else 1.0
-                            
-                            assign_worker_to_task(worker, task, current_time_minutes, slot_duration_minutes)
-                            assigned_workers.add(worker.name)
-                            
-                            simulation_log.append({
-                                "time": format_time(current_time_minutes),
-                                "event": f"Worker {worker.name} started {task.instance_id} (level {level}, skill: {skill_score:.2f})"
-                            })
-                    
-                    # Remove assigned workers from remaining list
-                    remaining_workers = [w for w in remaining_workers if w.name not in assigned_workers]
-            
-            # Priority 3: Assign any remaining workers to best available tasks
-            remaining_tasks = [t for t in all_available_tasks if t.status == "pending"]
-            for worker in remaining_workers:
-                if not remaining_tasks:
-                    break
-                
-                # Find best task for this worker based on skill match
-                best_task = None
-                best_score = 0
-                
-                for task in remaining_tasks:
-                    skill_score = calculate_skill_match(worker.skills, task.skill_requirements)
-                    favorite_bonus = 1.2 if task.product in worker.favorite_products else 1.0
-                    total_score = skill_score * favorite_bonus
-                    
-                    if total_score > best_score:
-                        best_score = total_score
-                        best_task = task
-                
-                if best_task:
-                    assign_worker_to_task(worker, best_task, current_time_minutes, slot_duration_minutes)
-                    remaining_tasks.remove(best_task)
-                    
-                    simulation_log.append({
-                        "time": format_time(current_time_minutes),
-                        "event": f"Worker {worker.name} started {best_task.instance_id} (fallback assignment)"
-                    })
-            
-            # Record schedule and inventory
-            inventory_str = ", ".join([f"{task_id} {count} pcs" for task_id, count in inventory.items() if count > 0])
-            if not inventory_str:
-                inventory_str = "None, just started"
-            
-            for worker_name, worker_data in worker_sim_data_map.items():
-                if not worker_data.is_available and worker_data.current_task_instance:
-                    task_desc = f"[{worker_data.current_task_instance.task_id}] {worker_data.current_task_instance.description}"
-                    schedule[current_day][worker_name][current_slot] = task_desc
-                else:
-                    schedule[current_day][worker_name][current_slot] = "idle"
-            
-            # Store inventory for this time slot
-            schedule[current_day]["Available semi-finished tasks"][current_slot] = inventory_str
-            
-            # Advance time
-            current_time_minutes += slot_duration_minutes
-            
-            # Check if all tasks are completed
-            if all(t.status == "completed" for t in all_task_instances):
-                break
-        
-        return {
-            "schedule": schedule,
-            "inventory": dict(inventory),
-            "simulation_log": simulation_log,
-            "estimated_days": estimated_days,
-            "all_task_instances": all_task_instances,
-            "worker_sim_data_map": worker_sim_data_map
-        }
-    
+        rows_df = read_catalog_rows(uploaded_file, uploaded_file.name)
+        count = import_catalog_rows(get_catalog_store(), table, rows_df)
+        return True, f"{count} baris berhasil diimpor!"
+    except CatalogValidationError as e:
+        problems = "<br>".join(f"• {html.escape(error)}" for error in e.errors)
+        return False, f"Impor dibatalkan, tidak ada baris yang disimpan:<br>{problems}"
+    except Exception as e:
+        return False, f"Error mengimpor file: {e}"
+
+def render_bulk_import(table):
+    """Merender unggahan file CSV/JSONL untuk impor massal ke satu tabel katalog"""
+    st.write("**Impor Massal dari File**")
+    st.caption("Kolom: " + ", ".join(CATALOG_TABLES[table]["columns"]))
+    uploaded_file = st.file_uploader("Pilih file CSV atau JSONL", type=["csv", "jsonl"], key=f"{table}_bulk_file")
+
+    if uploaded_file is not None:
+        if st.button("📥 Impor", type="primary", key=f"{table}_bulk_import_btn"):
+            success, message = import_catalog_file(table, uploaded_file)
+            if success:
+                st.markdown(f'<div class="success-box">{message}</div>', unsafe_allow_html=True)
+                st.rerun() # Memuat ulang aplikasi untuk melihat perubahan
+            else:
+                st.markdown(f'<div class="error-box">{message}</div>', unsafe_allow_html=True)
+
+def run_simulation(**simulation_args):
+    """Run the scheduling engine, or reuse the cached result of an identical request, and report
+    a failure in the UI instead of raising. Returns (result, cache_key, from_cache); result is None
+    on failure."""
+    cache_key = None
+    try:
+        result_cache = get_result_cache()
+        cache_key = simulation_cache_key(**simulation_args)
+        result = result_cache.get(cache_key)
+        if result is not None:
+            return result, cache_key, True
+        result = assign_tasks(**simulation_args)
+        result_cache.put(cache_key, result)
+        return result, cache_key, False
     except Exception as e:
         st.error(f"Error in simulation: {str(e)}")
-        return None
+        return None, cache_key, False
 
 # --- Display Functions ---
-def display_schedule_gantt(schedule_data, estimated_days):
-    """Display schedule in simplified Gantt chart format with day tabs"""
+def get_schedule_day_frame(schedule_grid, day, result_key):
+    """Build the schedule table of a day once per simulation result, identified by result_key
+    (its simulation_cache_key)"""
+    day_frames = st.session_state.setdefault("schedule_day_frames", {})
+    key = (result_key, day)
+    if key not in day_frames:
+        day_frames[key] = schedule_grid.day_frame(day)
+    return day_frames[key]
+
+def display_schedule_gantt(schedule_grid, estimated_days, result_key):
+    """Display the schedule of the day picked in the day selector"""
     st.subheader("Tasks Schedule")
     
-    # Create tabs for each day
     if estimated_days > 0:
-        day_tabs = st.tabs([f"Day {day}" for day in range(1, estimated_days + 1)])
-        
-        for day_idx, day in enumerate(range(1, estimated_days + 1)):
-            with day_tabs[day_idx]:
-                if day in schedule_data:
-                    # Create schedule table
-                    day_schedule = schedule_data[day]
-                    
-                    # Get all time slots
-                    all_slots = set()
-                    for worker_schedule in day_schedule.values():
-                        if isinstance(worker_schedule, dict):
-                            all_slots.update(worker_schedule.keys())
-                    
-                    if all_slots:
-                        max_slot = max(all_slots)
-                        
-                        # Create DataFrame for display
-                        schedule_rows = []
-                        for slot in range(max_slot + 1):
-                            time_str = format_time(slot * 30)
-                            row = {"TIME": time_str}
-                            
-                            # Add worker columns
-                            for worker_name in sorted(day_schedule.keys()):
-                                # Display "Available semi-finished tasks" as well
-                                if isinstance(day_schedule[worker_name], dict):
-                                    task_desc = day_schedule[worker_name].get(slot, "idle")
-                                    row[f"{worker_name}"] = task_desc # Menggunakan worker_name langsung sebagai judul kolom
-                            
-                            schedule_rows.append(row)
-                        
-                        schedule_df = pd.DataFrame(schedule_rows)
-                        
-                        # Use container to ensure full width
-                        with st.container():
-                            st.dataframe(
-                                schedule_df, 
-                                use_container_width=True,
-                                hide_index=True
-                            )
-                    else:
-                        st.info("No schedule for today.")
-                else:
-                    st.info("No schedule for today.")
+        day = st.selectbox(
+            "Day",
+            list(range(1, estimated_days + 1)),
+            format_func=lambda day: f"Day {day}",
+            key="schedule_day"
+        )
+        
+        # Only the selected day is built and sent to the browser
+        schedule_df = get_schedule_day_frame(schedule_grid, day, result_key)
+        if schedule_df is not None:
+            # Use container to ensure full width
+            with st.container():
+                st.dataframe(
+                    schedule_df, 
+                    use_container_width=True,
+                    hide_index=True
+                )
+        else:
+            st.info("No schedule for today.")
     else:
         st.info("No schedule data.")
 
-def display_simulation_results(result):
-    """Display simulation results in tabs"""
+def format_makespan(minutes):
+    """Convert a simulation end time in minutes to 'Day N HH:MM'"""
+    day = minutes // (8 * 60) + 1
+    return f"Day {int(day)} {format_time(minutes % (8 * 60))}"
+
+def display_strategy_comparison(results):
+    """Show makespan and skill utilization of several assignment strategies side by side"""
+    st.subheader("Strategy Comparison")
+    comparison = []
+    for result in results:
+        completed = sum(1 for ti in result["task_instances"] if ti.status == "completed")
+        comparison.append({
+            "Strategy": ASSIGNMENT_STRATEGIES[result["assignment_strategy"]],
+            "Makespan": format_makespan(result["makespan_minutes"]) if result["all_tasks_completed"] else "Not finished",
+            "Makespan (min)": result["makespan_minutes"] if result["all_tasks_completed"] else None,
+            "Units Completed": completed,
+            "Total Skill Utilization": round(result["total_skill_utilization"], 2),
+            "Avg Skill Match": round(result["total_skill_utilization"] / completed, 3) if completed else 0.0
+        })
+    st.dataframe(pd.DataFrame(comparison), use_container_width=True, hide_index=True)
+
+def display_simulation_results(result, result_key, from_cache=False):
+    """Display simulation results in tabs. result_key is the result's simulation_cache_key and
+    from_cache marks a result reused from an earlier run."""
     if result is None:
         st.error("Simulation failed to be executed!")
         return
@@ -738,48 +350,22 @@ def display_simulation_results(result):
     tab1, tab2, tab3 = st.tabs(["📅 Schedule", "👥 Worker Stats", "📝 Simulation Log"])
     
     with tab1:
-        display_schedule_gantt(result["schedule"], result["estimated_days"])
+        display_schedule_gantt(result["schedule"], result["estimated_days"], result_key)
     
     with tab2:
         st.subheader("Worker Statistics")
         
-        worker_stats = []
-        for worker_name, worker_data in result["worker_sim_data_map"].items():
-            # Calculate completed tasks
-            completed_tasks = sum(1 for ti in result["all_task_instances"] 
-                                if ti.assigned_worker_name == worker_name and ti.status == "completed")
-            
-            # Calculate total working time
-            total_working_time = sum(ti.duration_slot * 30 for ti in result["all_task_instances"] 
-                                   if ti.assigned_worker_name == worker_name and ti.status == "completed")
-            
-            # Calculate average skill utilization
-            relevant_tasks = [ti for ti in result["all_task_instances"] 
-                            if ti.assigned_worker_name == worker_name and ti.status == "completed"]
-            
-            avg_skill_match = 0
-            if relevant_tasks:
-                skill_matches = [calculate_skill_match(worker_data.skills, ti.skill_requirements) 
-                               for ti in relevant_tasks]
-                avg_skill_match = sum(skill_matches) / len(skill_matches)
-            
-            worker_stats.append({
-                "Worker": worker_name,
-                "Tasks Completed": completed_tasks,
-                "Working Time (min)": total_working_time,
-                "Avg Skill Match": f"{avg_skill_match:.2f}",
-                "Status": "Available" if worker_data.is_available else "Busy"
-            })
-        
-        worker_stats_df = pd.DataFrame(worker_stats)
-        st.dataframe(worker_stats_df, use_container_width=True, hide_index=True)
+        worker_stats_df = compute_worker_stats(result)
+        display_df = worker_stats_df.assign(**{"Avg Skill Match": worker_stats_df["Avg Skill Match"].map("{:.2f}".format)})
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
         
         # Worker skill utilization chart
-        if worker_stats:
-            chart_data = pd.DataFrame([
-                {"Worker": ws["Worker"], "Skill Match": float(ws["Avg Skill Match"])} 
-                for ws in worker_stats if float(ws["Avg Skill Match"]) > 0
-            ])
+        if not worker_stats_df.empty:
+            chart_data = pd.DataFrame({
+                "Worker": worker_stats_df["Worker"],
+                "Skill Match": worker_stats_df["Avg Skill Match"].round(2)
+            })
+            chart_data = chart_data[chart_data["Skill Match"] > 0]
             
             if not chart_data.empty:
                 st.subheader("Worker Skill Utilization")
@@ -801,11 +387,39 @@ def display_simulation_results(result):
     
     with tab3:
         st.subheader("Simulation Log")
-        if result["simulation_log"]:
-            log_df = pd.DataFrame(result["simulation_log"])
+        if len(result["simulation_log"]):
+            log_df = result["simulation_log"].to_dataframe()
             st.dataframe(log_df, use_container_width=True, hide_index=True)
         else:
             st.info("No simulation events recorded.")
+    
+    if result.get("profile"):
+        display_performance(result["profile"], from_cache)
+
+def display_performance(profile, from_cache=False):
+    """Per-phase timing and counters of a profiled simulation run"""
+    with st.expander("Performance (cached result)" if from_cache else "Performance"):
+        if from_cache:
+            st.caption("This result was served from the cache: the timings below were measured when it was "
+                       "first computed, not on this run.")
+        counters = profile["counters"]
+        metric_cols = st.columns(5)
+        metric_cols[0].metric("Run Time", f"{profile['total_seconds'] * 1000:.1f} ms")
+        metric_cols[1].metric("Ticks", counters["ticks"])
+        metric_cols[2].metric("Decision Points", counters["decision_points"])
+        metric_cols[3].metric("Idle Ticks", counters["idle_ticks"])
+        metric_cols[4].metric("Assignments", counters["assignments"])
+        
+        phases_df = pd.DataFrame([
+            {
+                "Phase": phase.replace("_", " ").capitalize(),
+                "Calls": stats["calls"],
+                "Time (ms)": round(stats["seconds"] * 1000, 2),
+                "Share (%)": round(100 * stats["seconds"] / profile["total_seconds"], 1) if profile["total_seconds"] else 0.0
+            }
+            for phase, stats in profile["phases"].items()
+        ])
+        st.dataframe(phases_df, use_container_width=True, hide_index=True)
 
 def get_table_download_link(df, filename, text):
     """Generate a link to download the dataframe as a CSV file"""
@@ -814,6 +428,44 @@ def get_table_download_link(df, filename, text):
     href = f'<a href="data:file/csv;base64,{b64}" download="{filename}" style="color:blue;">{text}</a>'
     return href
 
+def render_scenario_sweep(products_to_produce, selected_workers, workers_df, products_df):
+    """What-if sweep over worker subsets, quantity scales and slot durations of the current order"""
+    with st.expander("🔀 What-if Scenario Sweep"):
+        col1, col2 = st.columns(2)
+        with col1:
+            quantity_scales_str = st.text_input("Quantity scales (comma separated)", value="0.5, 1, 2")
+            slot_durations = st.multiselect("Slot durations (min)", [15, 30, 45, 60, 90, 120], default=[30])
+        with col2:
+            leave_one_out = st.checkbox("Also try without each selected worker", value=True)
+            cpu_count = os.cpu_count() or 1
+            max_processes = st.number_input("Parallel processes", min_value=1, max_value=cpu_count, value=cpu_count, step=1)
+        
+        try:
+            quantity_scales = [float(scale) for scale in quantity_scales_str.split(",") if scale.strip()]
+        except ValueError:
+            st.error("Quantity scales must be numbers, e.g. 0.5, 1, 2")
+            return
+        
+        worker_subsets = {"All selected": selected_workers}
+        if leave_one_out and len(selected_workers) > 1:
+            for worker_name in selected_workers:
+                worker_subsets[f"Without {worker_name}"] = [w for w in selected_workers if w != worker_name]
+        scenarios = build_scenario_grid(products_to_produce, worker_subsets, quantity_scales, slot_durations)
+        st.write(f"{len(scenarios)} scenario(s)")
+        
+        if st.button("Run Sweep", disabled=not scenarios or not selected_workers):
+            catalog = get_compiled_catalog(catalog_content_hash(products_df), products_df)
+            progress = st.progress(0.0)
+            table = st.empty()
+            rows = []
+            try:
+                for row in run_scenario_sweep(scenarios, workers_df, products_df, catalog, max_processes):
+                    rows.append(row)
+                    progress.progress(len(rows) / len(scenarios))
+                    table.dataframe(pd.DataFrame(rows).sort_values("Scenario"), use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.error(f"Error in scenario sweep: {str(e)}")
+
 # --- Fungsi Antarmuka CRUD (Streamlit UI) ---
 def render_workers_crud(workers_df_current):
     """Merender antarmuka CRUD untuk pekerja"""
@@ -828,7 +480,7 @@ def render_workers_crud(workers_df_current):
         st.info("Tidak ada pekerja ditemukan. Tambahkan pekerja di bawah.")
 
     # Operasi CRUD
-    operation = st.selectbox("Pilih Operasi:", ["Tambah Pekerja", "Perbarui Pekerja", "Hapus Pekerja"])
+    operation = st.selectbox("Pilih Operasi:", ["Tambah Pekerja", "Perbarui Pekerja", "Hapus Pekerja", "Impor Massal"])
 
     if operation == "Tambah Pekerja":
         with st.form("add_worker_form"):
@@ -960,6 +612,9 @@ def render_workers_crud(workers_df_current):
         else:
             st.info("Tidak ada pekerja yang tersedia untuk dihapus.")
 
+    elif operation == "Impor Massal":
+        render_bulk_import("workers")
+
     st.markdown('</div>', unsafe_allow_html=True)
 
 def render_products_crud(products_df_current):
@@ -975,7 +630,7 @@ def render_products_crud(products_df_current):
         st.info("Tidak ada tugas produk ditemukan. Tambahkan tugas produk di bawah.")
 
     # Operasi CRUD
-    operation = st.selectbox("Pilih Operasi:", ["Tambah Tugas Produk", "Perbarui Tugas Produk", "Hapus Tugas Produk"], key="product_operation")
+    operation = st.selectbox("Pilih Operasi:", ["Tambah Tugas Produk", "Perbarui Tugas Produk", "Hapus Tugas Produk", "Impor Massal"], key="product_operation")
 
     if operation == "Tambah Tugas Produk":
         with st.form("add_product_form"):
@@ -1102,6 +757,9 @@ def render_products_crud(products_df_current):
         else:
             st.info("Tidak ada tugas produk yang tersedia untuk dihapus.")
 
+    elif operation == "Impor Massal":
+        render_bulk_import("products")
+
     st.markdown('</div>', unsafe_allow_html=True)
 
 
@@ -1202,9 +860,7 @@ def main():
             st.write("**Choose Product and Quantity:**")
             
             products_to_produce = {}
-            # Re-load unique_products here to ensure it's up-to-date with any CRUD changes
-            current_products_df = load_data()[1] 
-            unique_products_for_order = current_products_df["Product"].unique()
+            unique_products_for_order = products_df["Product"].unique()
             
             for product in unique_products_for_order:
                 quantity = st.number_input(
@@ -1220,12 +876,10 @@ def main():
         
         with col2:
             st.write("**Choose Worker(s):**")
-            # Re-load workers_df here to ensure it's up-to-date with any CRUD changes
-            current_workers_df = load_data()[0]
             selected_workers = st.multiselect(
                 "Choose Worker(s)",
-                current_workers_df["Worker"].tolist(),
-                default=current_workers_df["Worker"].tolist()
+                workers_df["Worker"].tolist(),
+                default=workers_df["Worker"].tolist()
             )
         
         # Order summary
@@ -1237,33 +891,70 @@ def main():
             
             st.write(f"• **Available worker(s)**: {len(selected_workers)} person(s)")
             
+            strategy_choice = st.selectbox(
+                "Assignment Strategy",
+                list(ASSIGNMENT_STRATEGIES.values()) + ["Compare both"],
+                help="Optimal matching keeps the level quotas but pairs workers and tasks to maximize the total skill x favorite score."
+            )
+            log_choice = st.selectbox(
+                "Simulation Log",
+                ["Full", "Summary", "Off"],
+                help="Summary records only task completions; Off skips the log, which speeds up large orders."
+            )
+            profile_choice = st.checkbox(
+                "Profile simulation",
+                value=False,
+                help="Time each phase of the simulation loop and show it under Performance."
+            )
+            
             # Run simulation button
             if st.button("🚀 Run Simulation"):
                 if not selected_workers:
                     st.error("Select at least one worker!")
                 else:
                     with st.spinner("Running Simulation..."):
-                        available_workers_df = current_workers_df[current_workers_df["Worker"].isin(selected_workers)]
+                        available_workers_df = workers_df[workers_df["Worker"].isin(selected_workers)]
+                        catalog = get_compiled_catalog(catalog_content_hash(products_df), products_df)
+                        if strategy_choice == "Compare both":
+                            strategies = list(ASSIGNMENT_STRATEGIES)
+                        else:
+                            strategies = [key for key, label in ASSIGNMENT_STRATEGIES.items() if label == strategy_choice]
                         
-                        result = assign_tasks(
-                            products_to_produce=products_to_produce,
-                            available_workers_df=available_workers_df,
-                            products_df=current_products_df, # Pastikan menggunakan products_df terbaru
-                            slot_duration_minutes=30
-                        )
+                        runs = [
+                            run_simulation(
+                                products_to_produce=products_to_produce,
+                                available_workers_df=available_workers_df,
+                                products_df=products_df,
+                                slot_duration_minutes=30,
+                                catalog=catalog,
+                                assignment_strategy=strategy,
+                                log_verbosity=log_choice.lower(),
+                                profile=profile_choice
+                            )
+                            for strategy in strategies
+                        ]
                         
-                        if result:
-                            display_simulation_results(result)
+                        # Keep the results across reruns (e.g. picking another schedule day)
+                        results = [result for result, _, _ in runs]
+                        st.session_state["simulation_results"] = results if all(results) else None
+                        st.session_state["simulation_result_key"] = runs[-1][1]
+                        st.session_state["simulation_from_cache"] = runs[-1][2]
+                        st.session_state["schedule_day_frames"] = {}
+            
+            results = st.session_state.get("simulation_results")
+            if results:
+                if len(results) > 1:
+                    display_strategy_comparison(results)
+                display_simulation_results(results[-1], st.session_state["simulation_result_key"],
+                                           st.session_state.get("simulation_from_cache", False))
+            
+            render_scenario_sweep(products_to_produce, selected_workers, workers_df, products_df)
         
     elif page == "Manage Workers":
-        # Muat ulang data untuk mendapatkan perubahan terbaru
-        workers_df_latest, _ = load_data()
-        render_workers_crud(workers_df_latest)
+        render_workers_crud(workers_df)
     
     elif page == "Manage Products":
-        # Muat ulang data untuk mendapatkan perubahan terbaru
-        _, products_df_latest = load_data()
-        render_products_crud(products_df_latest)
+        render_products_crud(products_df)
 
     elif page == "About":
         st.header("About the System")
@@ -0,0 +1,75 @@
+"""Catalog load benchmark: CSV vs SQLite vs memory-mapped .npy columns.
+
+Writes a synthetic catalog of the requested size in every storage format and reports the time to
+load both tables from a freshly opened store, the peak Python heap traced during the load and
+the size of the loaded frames (memory-mapped columns are not on the heap):
+
+    python benchmarks/catalog_load_benchmark.py --products 500 --workers 300
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from db import CsvCatalogStore, NpyCatalogStore, SqliteCatalogStore  # noqa: E402
+from workloads import generate_catalog, generate_workers  # noqa: E402
+
+def build_stores(directory, workers_df, products_df):
+    """One store per format, all holding the same catalog"""
+    workers_path = os.path.join(directory, "workers.csv")
+    products_path = os.path.join(directory, "products.csv")
+    workers_df.to_csv(workers_path, index=False)
+    products_df.to_csv(products_path, index=False)
+
+    stores = {"csv": lambda: CsvCatalogStore(workers_path, products_path)}
+    for name, store_class, path in [("sqlite", SqliteCatalogStore, os.path.join(directory, "catalog.db")),
+                                    ("npy", NpyCatalogStore, os.path.join(directory, "catalog"))]:
+        store_class(path).import_csv(workers_path, products_path)
+        stores[name] = lambda store_class=store_class, path=path: store_class(path)
+    return stores
+
+def measure(open_store, repeat):
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        store = open_store()
+        tables = store.load_workers(), store.load_products()
+        wall_times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    store = open_store()
+    tables = store.load_workers(), store.load_products()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "load_time_ms": round(min(wall_times) * 1000, 2),
+        "peak_heap_mib": round(peak_memory / 2**20, 3),
+        "frame_mib": round(sum(df.memory_usage(deep=True).sum() for df in tables) / 2**20, 3),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare catalog load time and memory across storage formats.")
+    parser.add_argument("--products", type=int, default=500, help="Synthetic products (default 500)")
+    parser.add_argument("--tasks-per-product", type=int, default=8, help="Tasks per product (default 8)")
+    parser.add_argument("--workers", type=int, default=300, help="Synthetic workers (default 300)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed loads per format, the fastest is reported (default 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic catalog (default 0)")
+    args = parser.parse_args(argv)
+
+    products_df = generate_catalog(num_products=args.products, tasks_per_product=args.tasks_per_product, seed=args.seed)
+    workers_df = generate_workers(args.workers, products_df["Product"].unique(), seed=args.seed)
+    print(f"{len(products_df)} product tasks, {len(workers_df)} workers", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = build_stores(directory, workers_df, products_df)
+        rows = [{"format": name, **measure(open_store, args.repeat)} for name, open_store in stores.items()]
+    print(pd.DataFrame(rows).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
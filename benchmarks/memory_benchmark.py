@@ -0,0 +1,68 @@
+"""Memory benchmark for the simulation data models.
+
+Reports the bytes allocated per TaskInstance, TaskSimulationData and WorkerSimulationData
+(measured with tracemalloc over many objects) and the peak memory of a large order.
+Run from the repository root:
+
+    python benchmarks/memory_benchmark.py [--instances 100000] [--units 2000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from system import (CompiledCatalog, TaskInstance, TaskSimulationData, WorkerSimulationData,  # noqa: E402
+                    assign_tasks, load_catalog_files)
+
+def bytes_per_object(factory, count):
+    """Average traced allocation of `count` objects built by factory(i), kept alive together"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding the objects is not part of their footprint
+    container = sys.getsizeof(objects)
+    return (after - before - container) / count
+
+def peak_order_memory(products_to_produce, workers_df, products_df, catalog):
+    tracemalloc.start()
+    result = assign_tasks(products_to_produce, workers_df, products_df, catalog=catalog, record_schedule=True)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bytes per simulation object and peak memory of a large order.")
+    parser.add_argument("--instances", type=int, default=100000, help="Objects allocated per model (default 100000)")
+    parser.add_argument("--units", type=int, default=2000, help="Units per product in the large order (default 2000)")
+    parser.add_argument("--workers", default="workers.csv", help="Worker catalog CSV (default workers.csv)")
+    parser.add_argument("--products", default="products.csv", help="Product catalog CSV (default products.csv)")
+    args = parser.parse_args(argv)
+    
+    workers_df, products_df = load_catalog_files(args.workers, args.products)
+    catalog = CompiledCatalog(products_df)
+    product_rows = [row for _, row in products_df.iterrows()]
+    worker_rows = [row for _, row in workers_df.iterrows()]
+    task_types = catalog.task_sim_data
+    
+    print(f"{'Model':<24}{'Bytes/object':>14}")
+    measurements = [
+        ("TaskInstance", lambda i: TaskInstance(task_types[i % len(task_types)], i + 1)),
+        ("TaskSimulationData", lambda i: TaskSimulationData(product_rows[i % len(product_rows)])),
+        ("WorkerSimulationData", lambda i: WorkerSimulationData(worker_rows[i % len(worker_rows)])),
+    ]
+    for name, factory in measurements:
+        count = args.instances if name == "TaskInstance" else max(1, args.instances // 50)
+        print(f"{name:<24}{bytes_per_object(factory, count):>14.1f}")
+    
+    products_to_produce = {product: args.units for product in catalog.products}
+    peak, result = peak_order_memory(products_to_produce, workers_df, products_df, catalog)
+    print(f"\nOrder of {sum(products_to_produce.values())} units "
+          f"({result['total_units']} task units, {len(workers_df)} workers): "
+          f"peak {peak / 2**20:.1f} MiB traced, {peak / max(1, result['total_units']):.0f} bytes per task unit")
+
+if __name__ == "__main__":
+    main()
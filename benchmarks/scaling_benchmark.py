@@ -0,0 +1,153 @@
+"""Scaling benchmark for assign_tasks on synthetic workloads.
+
+Varies one axis at a time around a base workload (workers, quantity per product, products)
+and reports wall time, peak traced memory, simulated ticks per second and makespan. Results
+are written as JSON so runs of different versions can be compared:
+
+    python benchmarks/scaling_benchmark.py -o benchmarks/results/current.json
+    python benchmarks/scaling_benchmark.py --axis workers --baseline benchmarks/results/current.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from system import CompiledCatalog, assign_tasks  # noqa: E402
+from workloads import generate_catalog, generate_order, generate_workers  # noqa: E402
+
+BASE_WORKLOAD = {"workers": 20, "quantity": 10, "products": 10}
+SCALING_AXES = {
+    "workers": [5, 20, 100, 300, 1000],
+    "quantity": [1, 10, 100, 1000],
+    "products": [1, 10, 50, 200],
+}
+
+def build_workload(workers, quantity, products, tasks_per_product, dag_depth, seed):
+    products_df = generate_catalog(num_products=products, tasks_per_product=tasks_per_product, dag_depth=dag_depth,
+                                   interchangeable_products=min(3, products), seed=seed)
+    workers_df = generate_workers(workers, products_df["Product"].unique(), seed=seed)
+    return workers_df, products_df, generate_order(products_df, quantity)
+
+def run_case(workload, args):
+    """Time one workload and return its measurements"""
+    workers_df, products_df, order = build_workload(
+        workload["workers"], workload["quantity"], workload["products"], args.tasks_per_product, args.dag_depth, args.seed
+    )
+    catalog = CompiledCatalog(products_df)
+    simulation_args = dict(
+        products_to_produce=order,
+        available_workers_df=workers_df,
+        products_df=products_df,
+        slot_duration_minutes=args.slot_duration,
+        catalog=catalog,
+        assignment_strategy=args.strategy,
+        record_schedule=not args.headless,
+        log_verbosity="off" if args.headless else "full",
+    )
+
+    wall_times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        result = assign_tasks(**simulation_args)
+        wall_times.append(time.perf_counter() - start)
+
+    peak_memory = None
+    if not args.no_memory:
+        tracemalloc.start()
+        assign_tasks(**simulation_args)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if result["all_tasks_completed"]:
+        horizon_minutes = result["makespan_minutes"]
+    else:
+        horizon_minutes = result["estimated_days"] * 8 * 60
+    ticks = horizon_minutes / args.slot_duration
+    wall_time = min(wall_times)
+    return {
+        **workload,
+        "task_types": len(catalog.task_ids),
+        "task_units": int(result["total_units"]),
+        "wall_time_s": round(wall_time, 6),
+        "peak_memory_mib": None if peak_memory is None else round(peak_memory / 2**20, 3),
+        "ticks": int(ticks),
+        "ticks_per_second": round(ticks / wall_time, 1) if wall_time > 0 else None,
+        "makespan_minutes": int(result["makespan_minutes"]),
+        "all_tasks_completed": bool(result["all_tasks_completed"]),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_table(cases, baseline_cases=None):
+    table = pd.DataFrame(cases)[["axis", "workers", "quantity", "products", "task_units", "wall_time_s",
+                                  "peak_memory_mib", "ticks_per_second", "makespan_minutes"]]
+    if baseline_cases:
+        baseline = {(case["axis"], case["workers"], case["quantity"], case["products"]): case["wall_time_s"]
+                    for case in baseline_cases}
+        table["speedup"] = [
+            round(baseline[key] / wall_time, 2) if key in baseline and wall_time > 0 else np.nan
+            for key, wall_time in zip(zip(table["axis"], table["workers"], table["quantity"], table["products"]),
+                                      table["wall_time_s"])
+        ]
+    print(table.to_string(index=False))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time assign_tasks on synthetic workloads along several scaling axes.")
+    parser.add_argument("--axis", action="append", choices=sorted(SCALING_AXES),
+                        help="Scaling axis to run (repeatable, default all)")
+    parser.add_argument("--tasks-per-product", type=int, default=6, help="Tasks per synthetic product (default 6)")
+    parser.add_argument("--dag-depth", type=int, default=4, help="Requirement levels per product (default 4)")
+    parser.add_argument("--slot-duration", type=int, default=30, help="Slot duration in minutes (default 30)")
+    parser.add_argument("--strategy", default="greedy", help="Assignment strategy (default greedy)")
+    parser.add_argument("--headless", action="store_true", help="Skip the schedule grid and the event log")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case, the fastest is reported (default 3)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak memory run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic workloads (default 0)")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compute speedups against")
+    args = parser.parse_args(argv)
+
+    cases = []
+    for axis in args.axis or list(SCALING_AXES):
+        for value in SCALING_AXES[axis]:
+            workload = {**BASE_WORKLOAD, axis: value}
+            case = {"axis": axis, **run_case(workload, args)}
+            cases.append(case)
+            print(f"{axis}={value}: {case['wall_time_s']:.3f}s", file=sys.stderr)
+
+    baseline_cases = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_cases = json.load(f)["cases"]
+    print_table(cases, baseline_cases)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+                "cases": cases,
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
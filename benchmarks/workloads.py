@@ -0,0 +1,79 @@
+"""Synthetic catalogs and worker pools for the scheduler benchmarks.
+
+The generated DataFrames have the same columns as products.csv and workers.csv, so they can be
+passed to assign_tasks directly or written out as CSV files.
+"""
+import numpy as np
+import pandas as pd
+
+SKILL_COLUMNS = ["Bending", "Gluing", "Assembling", "EdgeScrap", "OpenPaper", "QualityControl"]
+
+# get_task_group maps ST<n>, SL<n> and BH<n> to the same group T<n>, so only products using
+# these prefixes can have interchangeable tasks.
+INTERCHANGEABLE_PREFIXES = ["ST", "SL", "BH"]
+
+def generate_catalog(num_products=10, tasks_per_product=6, dag_depth=4, max_requirements=2,
+                     interchangeable_products=0, max_duration_slots=2, seed=0):
+    """Products DataFrame of num_products products with tasks_per_product tasks each.
+
+    The tasks of a product are spread over dag_depth levels (the DAG width is
+    tasks_per_product / dag_depth). Every task below the first level requires 1 to
+    max_requirements tasks of the level above it. The first interchangeable_products products
+    (at most 3) use the ST/SL/BH task ids, so their same-numbered tasks are interchangeable.
+    Durations are drawn from 1 to max_duration_slots slots.
+    """
+    if interchangeable_products > len(INTERCHANGEABLE_PREFIXES):
+        raise ValueError(f"At most {len(INTERCHANGEABLE_PREFIXES)} products can have interchangeable tasks")
+    rng = np.random.default_rng(seed)
+    dag_depth = max(1, min(dag_depth, tasks_per_product))
+    levels = np.array_split(np.arange(tasks_per_product), dag_depth)
+
+    rows = []
+    for product_idx in range(num_products):
+        product = f"Product {product_idx + 1}"
+        if product_idx < interchangeable_products:
+            prefix = INTERCHANGEABLE_PREFIXES[product_idx]
+        else:
+            prefix = f"P{product_idx + 1}-"
+        task_ids = [f"{prefix}{task_idx + 1}" for task_idx in range(tasks_per_product)]
+
+        for level_idx, level in enumerate(levels):
+            for task_idx in level:
+                requirements = []
+                if level_idx > 0:
+                    previous_level = levels[level_idx - 1]
+                    num_requirements = rng.integers(1, min(max_requirements, len(previous_level)) + 1)
+                    chosen = sorted(rng.choice(previous_level, size=num_requirements, replace=False))
+                    requirements = [task_ids[idx] for idx in chosen]
+
+                skills = rng.integers(10, 101, size=len(SKILL_COLUMNS))
+                rows.append({
+                    "Product": product,
+                    "Task": f"synthetic task {task_idx + 1} of {product}",
+                    "Result": task_ids[task_idx],
+                    "Requirements": ", ".join(requirements),
+                    **dict(zip(SKILL_COLUMNS, skills.tolist())),
+                    "DurationSlot": int(rng.integers(1, max_duration_slots + 1)),
+                })
+    return pd.DataFrame(rows)
+
+def generate_workers(num_workers=20, products=(), seed=0):
+    """Workers DataFrame with skills between 0.3 and 1.0 and up to three favorite products"""
+    rng = np.random.default_rng(seed)
+    products = list(products)
+    rows = []
+    for worker_idx in range(num_workers):
+        favorites = list(rng.choice(products, size=min(3, len(products)), replace=False)) if products else []
+        favorites += [""] * (3 - len(favorites))
+        rows.append({
+            "Worker": f"Worker {worker_idx + 1}",
+            **dict(zip(SKILL_COLUMNS, np.round(rng.uniform(0.3, 1.0, size=len(SKILL_COLUMNS)), 2).tolist())),
+            "FavoriteProduct1": favorites[0],
+            "FavoriteProduct2": favorites[1],
+            "FavoriteProduct3": favorites[2],
+        })
+    return pd.DataFrame(rows)
+
+def generate_order(products_df, quantity):
+    """Order of `quantity` units of every product in products_df"""
+    return {product: quantity for product in products_df["Product"].unique()}
@@ -0,0 +1,497 @@
+"""Storage backends for the worker and product catalogs.
+
+CsvCatalogStore keeps workers.csv and products.csv and rewrites a whole file on every change.
+SqliteCatalogStore keeps both tables in one SQLite database (WAL mode, indexed on Worker and
+Result) and inserts, updates and deletes single rows. NpyCatalogStore keeps every column in its
+own .npy file (text columns dictionary-encoded) and memory-maps them on load, for large catalogs
+that are read far more often than edited. open_catalog_store() picks the backend.
+All report a version per table that changes on every write, for callers that cache the tables.
+CSV stays the import/export format; run `python db.py --help` for the commands.
+import_catalog_rows() validates a batch of new rows in one pass and adds them in one write.
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+WORKER_COLUMNS = [
+    "Worker", "Bending", "Gluing", "Assembling", "EdgeScrap", "OpenPaper", "QualityControl",
+    "FavoriteProduct1", "FavoriteProduct2", "FavoriteProduct3"
+]
+PRODUCT_COLUMNS = [
+    "Product", "Task", "Result", "Requirements", "Bending", "Gluing", "Assembling", "EdgeScrap",
+    "OpenPaper", "QualityControl", "DurationSlot"
+]
+TEXT_COLUMNS = {"Worker", "FavoriteProduct1", "FavoriteProduct2", "FavoriteProduct3",
+                "Product", "Task", "Result", "Requirements"}
+
+SKILL_COLUMNS = ["Bending", "Gluing", "Assembling", "EdgeScrap", "OpenPaper", "QualityControl"]
+
+# Table name -> key column, columns in CSV order, and the columns a new row must fill
+CATALOG_TABLES = {
+    "workers": {"key": "Worker", "columns": WORKER_COLUMNS, "required": ["Worker"] + SKILL_COLUMNS},
+    "products": {"key": "Result", "columns": PRODUCT_COLUMNS,
+                 "required": ["Product", "Task", "Result"] + SKILL_COLUMNS + ["DurationSlot"]},
+}
+
+# Accepted skill values. The Manage pages write 0-100 for both tables while the bundled
+# workers.csv uses fractions, so only the outer bounds are checked.
+SKILL_RANGE = (0, 100)
+
+def _to_sql_value(value):
+    """Plain Python value for sqlite3: NaN becomes NULL and NumPy scalars are unwrapped"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class CatalogStore:
+    """Interface of the catalog storage backends.
+
+    table is "workers" or "products"; rows are dicts keyed by column name and identified by the
+    table's key column (Worker or Result).
+    """
+    def load(self, table):
+        """The whole table as a DataFrame with the CSV columns, in insertion order"""
+        raise NotImplementedError
+
+    def insert(self, table, row):
+        raise NotImplementedError
+
+    def insert_many(self, table, df):
+        """Append all rows of df in a single write"""
+        raise NotImplementedError
+
+    def update(self, table, key_value, row):
+        """Overwrite the given columns of the row whose key is key_value; False if there is none"""
+        raise NotImplementedError
+
+    def delete(self, table, key_value):
+        """Delete the row whose key is key_value; False if there is none"""
+        raise NotImplementedError
+
+    def replace_all(self, table, df):
+        """Replace the whole table with the rows of df"""
+        raise NotImplementedError
+
+    def version(self, table):
+        """Cheap token that changes whenever the table is written, to key cached copies of it"""
+        raise NotImplementedError
+
+    def load_workers(self):
+        return self.load("workers")
+
+    def load_products(self):
+        return self.load("products")
+
+    def import_csv(self, workers_path="workers.csv", products_path="products.csv"):
+        """Replace both tables with the contents of the CSV files"""
+        self.replace_all("workers", pd.read_csv(workers_path))
+        self.replace_all("products", pd.read_csv(products_path))
+
+    def export_csv(self, workers_path="workers.csv", products_path="products.csv"):
+        self.load("workers").to_csv(workers_path, index=False)
+        self.load("products").to_csv(products_path, index=False)
+
+class WholeTableCatalogStore(CatalogStore):
+    """Base of the file stores, which apply every change by rewriting the whole table"""
+    def _load_for_write(self, table):
+        """The table as a DataFrame that can be modified in place"""
+        return self.load(table)
+
+    def insert(self, table, row):
+        df = self._load_for_write(table)
+        self.replace_all(table, pd.concat([df, pd.DataFrame([row])], ignore_index=True))
+
+    def insert_many(self, table, df):
+        current = self._load_for_write(table)
+        self.replace_all(table, pd.concat([current, df], ignore_index=True) if len(current) else df)
+
+    def update(self, table, key_value, row):
+        df = self._load_for_write(table)
+        matches = df.index[df[CATALOG_TABLES[table]["key"]] == key_value]
+        if len(matches) == 0:
+            return False
+        for column, value in row.items():
+            df.loc[matches[0], column] = value
+        self.replace_all(table, df)
+        return True
+
+    def delete(self, table, key_value):
+        df = self._load_for_write(table)
+        keep = df[CATALOG_TABLES[table]["key"]] != key_value
+        if keep.all():
+            return False
+        self.replace_all(table, df[keep].reset_index(drop=True))
+        return True
+
+class CsvCatalogStore(WholeTableCatalogStore):
+    """Catalog kept in CSV files; every change rewrites the file of its table"""
+    def __init__(self, workers_path="workers.csv", products_path="products.csv"):
+        self.paths = {"workers": workers_path, "products": products_path}
+
+    def load(self, table):
+        path = self.paths[table]
+        if not os.path.exists(path):
+            # Create an empty file with the expected columns
+            empty_df = pd.DataFrame(columns=CATALOG_TABLES[table]["columns"])
+            empty_df.to_csv(path, index=False)
+            return empty_df
+        return pd.read_csv(path)
+
+    def replace_all(self, table, df):
+        df.to_csv(self.paths[table], index=False)
+
+    def version(self, table):
+        """Modification time and size of the table's file, None while it does not exist"""
+        try:
+            stat = os.stat(self.paths[table])
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+class SqliteCatalogStore(CatalogStore):
+    """Catalog kept in a SQLite database, one table per catalog with a unique index on its key.
+
+    The database runs in WAL mode so readers in other Streamlit sessions are not blocked by a
+    write. A connection is opened per operation, which keeps the store safe to share between threads.
+    Every write also bumps the table's counter in catalog_versions, in the same transaction.
+    """
+    def __init__(self, path="catalog.db"):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                for table, spec in CATALOG_TABLES.items():
+                    column_defs = ", ".join(
+                        f'"{column}" {"TEXT" if column in TEXT_COLUMNS else "NUMERIC"}' for column in spec["columns"]
+                    )
+                    conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {column_defs})')
+                    conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_key ON {table} ("{spec["key"]}")')
+                conn.execute("CREATE TABLE IF NOT EXISTS catalog_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _bump_version(conn, table):
+        conn.execute("INSERT INTO catalog_versions (name, version) VALUES (?, 1) "
+                     "ON CONFLICT(name) DO UPDATE SET version = version + 1", (table,))
+
+    def load(self, table):
+        columns = ", ".join(f'"{column}"' for column in CATALOG_TABLES[table]["columns"])
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(f"SELECT {columns} FROM {table} ORDER BY id", conn)
+
+    def insert(self, table, row):
+        columns = [column for column in CATALOG_TABLES[table]["columns"] if column in row]
+        placeholders = ", ".join("?" for _ in columns)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})",
+                         [_to_sql_value(row[column]) for column in columns])
+            self._bump_version(conn, table)
+
+    def insert_many(self, table, df):
+        columns = [column for column in CATALOG_TABLES[table]["columns"] if column in df.columns]
+        placeholders = ", ".join("?" for _ in columns)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        rows = [[_to_sql_value(value) for value in record] for record in df[columns].itertuples(index=False)]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})", rows)
+            self._bump_version(conn, table)
+
+    def update(self, table, key_value, row):
+        columns = [column for column in CATALOG_TABLES[table]["columns"] if column in row]
+        if not columns:
+            return False
+        assignments = ", ".join(f'"{column}" = ?' for column in columns)
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                f'UPDATE {table} SET {assignments} WHERE "{CATALOG_TABLES[table]["key"]}" = ?',
+                [_to_sql_value(row[column]) for column in columns] + [_to_sql_value(key_value)]
+            )
+            if cursor.rowcount == 0:
+                return False
+            self._bump_version(conn, table)
+            return True
+
+    def delete(self, table, key_value):
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(f'DELETE FROM {table} WHERE "{CATALOG_TABLES[table]["key"]}" = ?',
+                                  [_to_sql_value(key_value)])
+            if cursor.rowcount == 0:
+                return False
+            self._bump_version(conn, table)
+            return True
+
+    def replace_all(self, table, df):
+        columns = [column for column in CATALOG_TABLES[table]["columns"] if column in df.columns]
+        placeholders = ", ".join("?" for _ in columns)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        rows = [[_to_sql_value(value) for value in record] for record in df[columns].itertuples(index=False)]
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"DELETE FROM {table}")
+            # A repeated key keeps its last row, like CompiledCatalog does
+            conn.executemany(f"INSERT OR REPLACE INTO {table} ({column_list}) VALUES ({placeholders})", rows)
+            self._bump_version(conn, table)
+
+    def version(self, table):
+        """Write counter of the table (0 before its first write)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT version FROM catalog_versions WHERE name = ?", (table,)).fetchone()
+        return row[0] if row else 0
+
+class NpyCatalogStore(WholeTableCatalogStore):
+    """Catalog kept as one memory-mapped .npy file per column, in a directory.
+
+    Numeric columns are stored with the dtype they had when written. Text columns are
+    dictionary-encoded: an int32 codes file (-1 for a missing value) plus a small file of the
+    distinct strings, and load as pandas Categoricals. A load maps the files read-only instead of
+    parsing them, so the returned frames must not be modified.
+
+    Every write produces a new generation directory <table>-<n>; the <table>.json manifest is
+    switched to it atomically and older generations are removed, which leaves the maps of frames
+    loaded earlier intact on POSIX systems.
+    """
+    def __init__(self, directory="catalog"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _manifest_path(self, table):
+        return os.path.join(self.directory, f"{table}.json")
+
+    def _read_manifest(self, table):
+        try:
+            with open(self._manifest_path(table)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self, table):
+        manifest = self._read_manifest(table)
+        if manifest is None:
+            return pd.DataFrame(columns=CATALOG_TABLES[table]["columns"])
+
+        generation_dir = os.path.join(self.directory, f"{table}-{manifest['generation']}")
+        df = pd.DataFrame(index=pd.RangeIndex(manifest["rows"]))
+        # insert() keeps each column in its own block, so numeric columns stay backed by the map
+        for position, column in enumerate(manifest["columns"]):
+            name = column["name"]
+            if column["kind"] == "text":
+                codes = np.load(os.path.join(generation_dir, f"{name}.codes.npy"), mmap_mode="r")
+                categories = np.load(os.path.join(generation_dir, f"{name}.categories.npy"))
+                values = pd.Categorical.from_codes(codes, categories=pd.Index(categories))
+            else:
+                values = np.load(os.path.join(generation_dir, f"{name}.npy"), mmap_mode="r")
+            df.insert(position, name, values)
+        return df
+
+    def _load_for_write(self, table):
+        df = self.load(table)
+        return pd.DataFrame({
+            column: (df[column].astype(object) if isinstance(df[column].dtype, pd.CategoricalDtype)
+                     else df[column].to_numpy(copy=True))
+            for column in df.columns
+        })
+
+    def replace_all(self, table, df):
+        manifest = self._read_manifest(table)
+        generation = manifest["generation"] + 1 if manifest else 1
+        generation_dir = os.path.join(self.directory, f"{table}-{generation}")
+        os.makedirs(generation_dir, exist_ok=True)
+
+        columns = []
+        for name in df.columns:
+            values = df[name]
+            if name in TEXT_COLUMNS:
+                codes, categories = pd.factorize(values.astype(object))
+                np.save(os.path.join(generation_dir, f"{name}.codes.npy"), codes.astype(np.int32))
+                np.save(os.path.join(generation_dir, f"{name}.categories.npy"),
+                        np.array([str(category) for category in categories], dtype=str))
+                columns.append({"name": name, "kind": "text"})
+            else:
+                np.save(os.path.join(generation_dir, f"{name}.npy"), pd.to_numeric(values).to_numpy())
+                columns.append({"name": name, "kind": "numeric"})
+
+        temp_path = f"{self._manifest_path(table)}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"generation": generation, "rows": len(df), "columns": columns}, f)
+        os.replace(temp_path, self._manifest_path(table))
+
+        for entry in os.listdir(self.directory):
+            prefix, _, entry_generation = entry.rpartition("-")
+            if prefix == table and entry_generation.isdigit() and int(entry_generation) < generation:
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+    def version(self, table):
+        """Generation of the table, None before its first write"""
+        manifest = self._read_manifest(table)
+        return manifest["generation"] if manifest else None
+
+def open_catalog_store(db_path=None, workers_path="workers.csv", products_path="products.csv", catalog_dir=None):
+    """The catalog store selected by the arguments or, failing those, the environment.
+
+    SqliteCatalogStore when a database path is given (or set in CATALOG_DB), NpyCatalogStore when
+    a column directory is given (or set in CATALOG_DIR), else CsvCatalogStore. A database or
+    directory that does not exist yet is created and filled once from the CSV files, if present.
+    """
+    db_path = db_path or os.environ.get("CATALOG_DB")
+    catalog_dir = catalog_dir or os.environ.get("CATALOG_DIR")
+    if db_path:
+        is_new = not os.path.exists(db_path)
+        store = SqliteCatalogStore(db_path)
+    elif catalog_dir:
+        is_new = not os.path.exists(catalog_dir)
+        store = NpyCatalogStore(catalog_dir)
+    else:
+        return CsvCatalogStore(workers_path, products_path)
+
+    if is_new and os.path.exists(workers_path) and os.path.exists(products_path):
+        store.import_csv(workers_path, products_path)
+    return store
+
+# --- Bulk import ---
+
+class CatalogValidationError(ValueError):
+    """A batch of catalog rows was rejected; errors lists every problem found"""
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+def read_catalog_rows(source, name=None):
+    """DataFrame of the rows in a CSV or JSON Lines file (path or file object).
+
+    The format follows the file name (name, or source when it is a path): .jsonl/.ndjson is read
+    as JSON Lines, anything else as CSV.
+    """
+    name = name or (source if isinstance(source, str) else getattr(source, "name", ""))
+    if str(name).lower().endswith((".jsonl", ".ndjson")):
+        return pd.read_json(source, lines=True, dtype=False)
+    return pd.read_csv(source)
+
+def _format_values(values, limit=5):
+    values = [str(value) for value in values]
+    shown = ", ".join(values[:limit])
+    return shown + (f" and {len(values) - limit} more" if len(values) > limit else "")
+
+def normalize_catalog_rows(table, rows_df):
+    """The rows with exactly the table's columns, in CSV order, and trimmed text"""
+    spec = CATALOG_TABLES[table]
+    rows = rows_df.reindex(columns=spec["columns"]).reset_index(drop=True)
+    for column in spec["columns"]:
+        if column in TEXT_COLUMNS:
+            text = rows[column].astype(object).where(rows[column].notna())
+            text = text.map(lambda value: str(value).strip(), na_action="ignore")
+            rows[column] = text.where(text != "")
+    return rows
+
+def validate_catalog_rows(table, rows_df, existing_df):
+    """Problems that keep the normalized rows from being added to existing_df, as messages.
+
+    Each check runs over the whole batch at once: unknown and missing columns, empty required
+    values, duplicate keys within the batch or against the existing table, skills outside
+    SKILL_RANGE and, for products, durations below one slot and requirement ids that are
+    neither in the table nor in the batch.
+    """
+    spec = CATALOG_TABLES[table]
+    key = spec["key"]
+    errors = []
+
+    unknown_columns = [column for column in rows_df.columns if column not in spec["columns"]]
+    if unknown_columns:
+        errors.append(f"Unknown columns: {_format_values(unknown_columns)}")
+    missing_columns = [column for column in spec["required"] if column not in rows_df.columns]
+    if missing_columns:
+        errors.append(f"Missing columns: {_format_values(missing_columns)}")
+        return errors
+
+    rows = normalize_catalog_rows(table, rows_df)
+    row_numbers = rows.index + 1
+    for column in spec["required"]:
+        empty = rows[column].isna()
+        if empty.any():
+            errors.append(f"Empty {column} in rows {_format_values(row_numbers[empty])}")
+
+    keys = rows[key].dropna()
+    repeated = keys[keys.duplicated()].unique()
+    if len(repeated):
+        errors.append(f"Duplicate {key} in the file: {_format_values(repeated)}")
+    existing = keys[keys.isin(existing_df[key].astype(object))].unique()
+    if len(existing):
+        errors.append(f"{key} already exists: {_format_values(existing)}")
+
+    numeric_columns = SKILL_COLUMNS + (["DurationSlot"] if table == "products" else [])
+    numbers = rows[numeric_columns].apply(pd.to_numeric, errors="coerce")
+    not_numeric = numbers.isna() & rows[numeric_columns].notna()
+    for column in not_numeric.columns[not_numeric.any()]:
+        errors.append(f"{column} is not a number in rows {_format_values(row_numbers[not_numeric[column]])}")
+    out_of_range = (numbers[SKILL_COLUMNS] < SKILL_RANGE[0]) | (numbers[SKILL_COLUMNS] > SKILL_RANGE[1])
+    for column in out_of_range.columns[out_of_range.any()]:
+        errors.append(f"{column} outside {SKILL_RANGE[0]}-{SKILL_RANGE[1]} in rows "
+                      f"{_format_values(row_numbers[out_of_range[column]])}")
+
+    if table == "products":
+        durations = numbers["DurationSlot"]
+        bad_duration = durations.notna() & ((durations < 1) | (durations % 1 != 0))
+        if bad_duration.any():
+            errors.append(f"DurationSlot must be a whole number of slots (1 or more) in rows "
+                          f"{_format_values(row_numbers[bad_duration])}")
+
+        requirements = rows["Requirements"].dropna().str.split(",").explode().str.strip()
+        requirements = requirements[requirements != ""]
+        known_ids = pd.concat([existing_df[key].astype(object), keys])
+        unknown = requirements[~requirements.isin(known_ids)]
+        if len(unknown):
+            errors.append(f"Unknown requirement ids: {_format_values(unknown.unique())}")
+    return errors
+
+def import_catalog_rows(store, table, rows_df):
+    """Validate new rows against the stored table and add them all in one write.
+
+    Raises CatalogValidationError, and writes nothing, if any row is rejected. Returns the
+    number of rows added.
+    """
+    errors = validate_catalog_rows(table, rows_df, store.load(table))
+    if errors:
+        raise CatalogValidationError(errors)
+    rows = normalize_catalog_rows(table, rows_df)
+    for column in set(CATALOG_TABLES[table]["columns"]) - TEXT_COLUMNS:
+        rows[column] = pd.to_numeric(rows[column])
+    if len(rows):
+        store.insert_many(table, rows)
+    return len(rows)
+
+CATALOG_FORMATS = {"sqlite": SqliteCatalogStore, "npy": NpyCatalogStore}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export a catalog database or column directory as CSV files.")
+    parser.add_argument("command", choices=["import", "export"],
+                        help="import: CSV files -> store (replacing its contents); export: store -> CSV files")
+    parser.add_argument("store", help="SQLite database file, or directory of .npy columns with --format npy")
+    parser.add_argument("--format", choices=sorted(CATALOG_FORMATS), default="sqlite",
+                        help="Storage format of the store (default sqlite)")
+    parser.add_argument("--workers", default="workers.csv", help="Worker catalog CSV (default workers.csv)")
+    parser.add_argument("--products", default="products.csv", help="Product catalog CSV (default products.csv)")
+    args = parser.parse_args(argv)
+
+    store = CATALOG_FORMATS[args.format](args.store)
+    if args.command == "import":
+        store.import_csv(args.workers, args.products)
+    else:
+        store.export_csv(args.workers, args.products)
+    counts = {table: len(store.load(table)) for table in CATALOG_TABLES}
+    print(f"{args.command}: {counts['workers']} workers, {counts['products']} product tasks", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2273 @@
+"""Scheduling engine of the Task Auto-Assignment System.
+
+Everything needed to simulate a production order lives here, without any Streamlit or Altair
+imports, so the engine can run headless. Run `python system.py --help` for the JSONL batch CLI.
+"""
+import argparse
+import copy
+import hashlib
+import heapq
+import json
+import math
+import multiprocessing
+import numbers
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# --- Data Models for Simulation ---
+# The models use __slots__ and share everything immutable with their task type: a large order
+# creates one TaskInstance per started unit, so per-instance state is kept to the mutable fields.
+class TaskSimulationData:
+    __slots__ = ("product", "description", "task_id", "requirements", "skill_requirements",
+                 "duration_slot", "task_index")
+    
+    def __init__(self, product_row):
+        self.product = sys.intern(str(product_row["Product"]))
+        self.description = sys.intern(str(product_row["Task"]))
+        self.task_id = sys.intern(str(product_row["Result"]))
+        # Handle NaN requirements gracefully
+        requirements_str = str(product_row["Requirements"])
+        if pd.isna(product_row["Requirements"]) or requirements_str.lower() == "nan":
+            self.requirements = ()
+        else:
+            self.requirements = tuple(sys.intern(req.strip()) for req in requirements_str.split(",") if req.strip())
+        
+        self.skill_requirements = {
+            "Bending": product_row["Bending"] / 100, 
+            "Gluing": product_row["Gluing"] / 100,
+            "Assembling": product_row["Assembling"] / 100,
+            "EdgeScrap": product_row["EdgeScrap"] / 100,
+            "OpenPaper": product_row["OpenPaper"] / 100,
+            "QualityControl": product_row["QualityControl"] / 100,
+        }
+        self.duration_slot = product_row["DurationSlot"]
+        self.task_index = None  # Set by CompiledCatalog
+
+    def __repr__(self):
+        return f"TaskSimData(ID={self.task_id}, Product={self.product}, Req={list(self.requirements)})"
+
+class WorkerSimulationData:
+    __slots__ = ("name", "skills", "favorite_products", "worker_index", "is_available",
+                 "current_task_instance", "time_remaining_on_task", "expected_completion_time",
+                 "is_aggressive", "aggressiveness_factor", "progression_score",
+                 "total_tasks_completed_units", "skill_utilization_score", "current_product_focus",
+                 "joined_at_minutes", "left_at_minutes", "earlier_presence",
+                 "_task_history", "_completed_products_count", "_time_spent_on_product")
+    
+    def __init__(self, worker_row, rng=None):
+        self.name = sys.intern(str(worker_row["Worker"]))
+        self.skills = {
+            "Bending": worker_row["Bending"],
+            "Gluing": worker_row["Gluing"],
+            "Assembling": worker_row["Assembling"],
+            "EdgeScrap": worker_row["EdgeScrap"],
+            "OpenPaper": worker_row["OpenPaper"],
+            "QualityControl": worker_row["QualityControl"],
+        }
+        # Handle potential NaN in favorite products
+        self.favorite_products = tuple(
+            sys.intern(str(worker_row[column])) if pd.notna(worker_row[column]) else ""
+            for column in ("FavoriteProduct1", "FavoriteProduct2", "FavoriteProduct3")
+        )
+        
+        # Simulation state
+        self.worker_index = None  # Row of this worker in the SkillMatchMatrix
+        self.is_available = True
+        self.current_task_instance = None
+        self.time_remaining_on_task = 0
+        self.expected_completion_time = 0
+        self.is_aggressive = False
+        self.aggressiveness_factor = (rng if rng is not None else np.random).uniform(0.2, 0.8)
+        self.progression_score = 0
+        self.total_tasks_completed_units = 0
+        self.skill_utilization_score = 0
+        self.current_product_focus = None
+        # Current presence window and the (joined, left) windows before it; only a resumed
+        # simulation (see resume_simulation) or the Dispatcher changes these
+        self.joined_at_minutes = 0
+        self.left_at_minutes = None
+        self.earlier_presence = ()
+        # History containers are created on first access
+        self._task_history = None
+        self._completed_products_count = None
+        self._time_spent_on_product = None
+    
+    @property
+    def task_history(self):
+        if self._task_history is None:
+            self._task_history = []
+        return self._task_history
+    
+    @property
+    def completed_products_count(self):
+        if self._completed_products_count is None:
+            self._completed_products_count = defaultdict(int)
+        return self._completed_products_count
+    
+    @property
+    def time_spent_on_product(self):
+        if self._time_spent_on_product is None:
+            self._time_spent_on_product = defaultdict(int)
+        return self._time_spent_on_product
+    
+    def mark_left(self, time_minutes):
+        self.is_available = False
+        self.left_at_minutes = time_minutes
+    
+    def mark_returned(self, time_minutes):
+        """Start a new presence window, keeping the one that ended when the worker left"""
+        self.earlier_presence += ((self.joined_at_minutes, self.left_at_minutes),)
+        self.is_available = True
+        self.joined_at_minutes = time_minutes
+        self.left_at_minutes = None
+    
+    def present_minutes(self, horizon_minutes):
+        """Minutes this worker was present between time zero and horizon_minutes"""
+        windows = self.earlier_presence + ((self.joined_at_minutes, self.left_at_minutes),)
+        return sum(max(0, min(horizon_minutes, left if left is not None else horizon_minutes) - joined)
+                   for joined, left in windows)
+        
+    def __repr__(self):
+        return f"WorkerSimData(Name={self.name}, Available={self.is_available})"
+
+class TaskInstance:
+    """One unit of a task type. Static fields are read through the shared TaskSimulationData."""
+    __slots__ = ("task_sim_data", "instance_idx", "status", "progress_percentage",
+                 "assigned_worker_name", "start_time_minutes", "completion_time_minutes",
+                 "_assigned_history")
+    
+    def __init__(self, task_sim_data, instance_idx):
+        self.task_sim_data = task_sim_data
+        self.instance_idx = instance_idx
+        
+        self.status = "pending"
+        self.progress_percentage = 0.0
+        self.assigned_worker_name = None
+        self.start_time_minutes = None
+        self.completion_time_minutes = None
+        self._assigned_history = None
+    
+    @property
+    def instance_id(self):
+        return f"{self.task_sim_data.task_id}_U{self.instance_idx}"
+    
+    @property
+    def product(self):
+        return self.task_sim_data.product
+    
+    @property
+    def task_id(self):
+        return self.task_sim_data.task_id
+    
+    @property
+    def task_index(self):
+        return self.task_sim_data.task_index
+    
+    @property
+    def description(self):
+        return self.task_sim_data.description
+    
+    @property
+    def requirements(self):
+        return self.task_sim_data.requirements
+    
+    @property
+    def skill_requirements(self):
+        return self.task_sim_data.skill_requirements
+    
+    @property
+    def duration_slot(self):
+        return self.task_sim_data.duration_slot
+    
+    @property
+    def assigned_history(self):
+        if self._assigned_history is None:
+            self._assigned_history = []
+        return self._assigned_history
+    
+    def __deepcopy__(self, memo):
+        # A completed or interrupted unit never changes again, so copies of a simulation state
+        # (see SimulationCheckpoint) share it; a running unit gets its own copy
+        if self.status in ("completed", "interrupted"):
+            return self
+        return copy.copy(self)
+        
+    def __repr__(self):
+        return f"TaskInstance(ID={self.instance_id}, TaskType={self.task_id}, Status={self.status}, Progress={self.progress_percentage:.1f}%)"
+
+SKILL_COLUMNS = ["Bending", "Gluing", "Assembling", "EdgeScrap", "OpenPaper", "QualityControl"]
+
+class CompiledCatalog:
+    """Integer-indexed view of products_df, built once per version of products.csv.
+    
+    Tasks are numbered in row order (a repeated Result ID keeps its last row). Requirements are
+    stored CSR-style as the distinct requirement group ids of each task (requirement_indptr /
+    requirement_groups) together with the inverse group -> dependent tasks adjacency, so the
+    simulation never splits requirement strings or derives task groups at runtime.
+    """
+    def __init__(self, products_df, content_hash=None):
+        self.content_hash = content_hash or catalog_content_hash(products_df)
+        
+        rows = {}
+        for _, row in products_df.iterrows():
+            rows[row["Result"]] = row
+        self.task_sim_data = [TaskSimulationData(row) for row in rows.values()]
+        self.task_ids = [task.task_id for task in self.task_sim_data]
+        self.task_index = {task_id: idx for idx, task_id in enumerate(self.task_ids)}
+        for idx, task in enumerate(self.task_sim_data):
+            task.task_index = idx
+        
+        self.products = list(dict.fromkeys(task.product for task in self.task_sim_data))
+        tasks_by_product = defaultdict(list)
+        for idx, task in enumerate(self.task_sim_data):
+            tasks_by_product[task.product].append(idx)
+        self.product_index = {product: idx for idx, product in enumerate(self.products)}
+        self.task_product = np.array([self.product_index[task.product] for task in self.task_sim_data], dtype=np.int32)
+        self.task_level = np.array([len(task.requirements) for task in self.task_sim_data], dtype=np.int32)
+        self.task_duration = np.array([task.duration_slot for task in self.task_sim_data], dtype=float)
+        self.skill_requirements = np.array(
+            [[task.skill_requirements[skill] for skill in SKILL_COLUMNS] for task in self.task_sim_data],
+            dtype=float
+        ).reshape(len(self.task_sim_data), len(SKILL_COLUMNS))
+        
+        # Interchangeable task groups (ST1, SL1 and BH1 all produce T1)
+        self.group_names = []
+        group_index = {}
+        def intern_group(task_id):
+            group = get_task_group(task_id)
+            if group not in group_index:
+                group_index[group] = len(self.group_names)
+                self.group_names.append(group)
+            return group_index[group]
+        
+        self.task_group = np.array([intern_group(task_id) for task_id in self.task_ids], dtype=np.int32)
+        
+        indptr = [0]
+        requirement_groups = []
+        for task in self.task_sim_data:
+            groups = list(dict.fromkeys(intern_group(req_task_id) for req_task_id in task.requirements))
+            requirement_groups.extend(groups)
+            indptr.append(len(requirement_groups))
+        self.requirement_indptr = np.array(indptr, dtype=np.int32)
+        self.requirement_groups = np.array(requirement_groups, dtype=np.int32)
+        
+        # Inverse adjacency: group -> tasks that require it
+        num_groups = len(self.group_names)
+        requiring_tasks = np.repeat(np.arange(len(self.task_ids), dtype=np.int32), np.diff(self.requirement_indptr))
+        order = np.argsort(self.requirement_groups, kind="stable")
+        self.dependent_tasks = requiring_tasks[order]
+        self.dependent_indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.requirement_groups, minlength=num_groups)))
+        ).astype(np.int32)
+        
+        self.product_tasks = {product: self._topological_tasks(tasks_by_product[product]) for product in self.products}
+        self.product_task_slots = {
+            product: float(self.task_duration[tasks].sum()) for product, tasks in self.product_tasks.items()
+        }
+    
+    def _topological_tasks(self, product_task_indices):
+        """Task indices of a product with requirements first, ties broken by Result ID"""
+        tasks = sorted(product_task_indices, key=lambda idx: self.task_ids[idx])
+        in_product = set(tasks)
+        prerequisites = {
+            idx: {self.task_index[req] for req in self.task_sim_data[idx].requirements
+                  if self.task_index.get(req) in in_product and self.task_index[req] != idx}
+            for idx in tasks
+        }
+        ordered = []
+        placed = set()
+        while len(ordered) < len(tasks):
+            ready = [idx for idx in tasks if idx not in placed and prerequisites[idx] <= placed]
+            if not ready:
+                # Requirement cycle: keep the remaining tasks in Result order
+                ready = [idx for idx in tasks if idx not in placed]
+            ordered.append(ready[0])
+            placed.add(ready[0])
+        return np.array(ordered, dtype=np.int32)
+    
+    def requirement_groups_of(self, task_idx):
+        return self.requirement_groups[self.requirement_indptr[task_idx]:self.requirement_indptr[task_idx + 1]]
+    
+    def dependents_of(self, group_idx):
+        return self.dependent_tasks[self.dependent_indptr[group_idx]:self.dependent_indptr[group_idx + 1]]
+    
+    def __repr__(self):
+        return f"CompiledCatalog(Tasks={len(self.task_ids)}, Products={len(self.products)}, Hash={self.content_hash[:12]})"
+
+def catalog_content_hash(products_df):
+    """Stable hash of a catalog table (products or workers), used in cache keys"""
+    digest = hashlib.sha256(",".join(map(str, products_df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(products_df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+# Helper functions
+def calculate_skill_match_matrix(worker_skills, task_skill_requirements):
+    """Skill match score of every worker (rows) for every task type (columns).
+    
+    For each task the score is the mean of worker_skill / required_ratio over the skills the
+    task actually requires (0.1 when it requires none).
+    """
+    worker_skills = np.asarray(worker_skills, dtype=float).reshape(-1, len(SKILL_COLUMNS))
+    task_skill_requirements = np.asarray(task_skill_requirements, dtype=float).reshape(-1, len(SKILL_COLUMNS))
+    relevant = task_skill_requirements > 0
+    divisors = np.maximum(0.01, task_skill_requirements)
+    
+    total_score = np.zeros((worker_skills.shape[0], task_skill_requirements.shape[0]))
+    for skill_idx in range(len(SKILL_COLUMNS)):
+        total_score += np.where(relevant[:, skill_idx], worker_skills[:, skill_idx, None] / divisors[:, skill_idx], 0.0)
+    
+    num_relevant_skills = relevant.sum(axis=1)
+    return np.where(num_relevant_skills > 0, total_score / np.maximum(num_relevant_skills, 1), 0.1)
+
+class SkillMatchMatrix:
+    """Worker x task type scores for one simulation run.
+    
+    skill_match is the plain skill match; assignment_score folds in the 1.2 bonus for tasks of
+    one of the worker's favorite products and is what the assignment rules rank by.
+    preferences() gives a worker's task types ranked by that score, for the Priority 3 fallback.
+    """
+    def __init__(self, workers, catalog):
+        self.skill_match, self.assignment_score = self._score_rows(workers, catalog)
+        self._preferences = {}
+    
+    @staticmethod
+    def _score_rows(workers, catalog):
+        worker_skills = [[worker.skills[skill] for skill in SKILL_COLUMNS] for worker in workers]
+        skill_match = calculate_skill_match_matrix(worker_skills, catalog.skill_requirements)
+        
+        favorite = np.zeros((len(workers), len(catalog.products)), dtype=bool)
+        for worker_idx, worker in enumerate(workers):
+            for product in worker.favorite_products:
+                if product in catalog.product_index:
+                    favorite[worker_idx, catalog.product_index[product]] = True
+        favorite_bonus = np.where(favorite[:, catalog.task_product], 1.2, 1.0)
+        return skill_match, skill_match * favorite_bonus
+    
+    def add_workers(self, workers, catalog):
+        """Append the rows of workers that joined after the matrix was built"""
+        skill_match, assignment_score = self._score_rows(workers, catalog)
+        self.skill_match = np.vstack([self.skill_match, skill_match])
+        self.assignment_score = np.vstack([self.assignment_score, assignment_score])
+        # A shallow copy (see SimulationState.change_workers) must not fill the original's rankings
+        self._preferences = dict(self._preferences)
+    
+    def preferences(self, worker_idx):
+        """(ranked_types, tie_end) of a worker, ranked on first use and kept.
+        
+        ranked_types lists every task type by descending assignment score, and
+        ranked_types[i:tie_end[i]] are the types from i on that score the same as ranked_types[i].
+        """
+        ranking = self._preferences.get(worker_idx)
+        if ranking is None:
+            scores = self.assignment_score[worker_idx]
+            ranked_types = np.argsort(-scores)
+            ranked_scores = scores[ranked_types]
+            group_ends = np.append(np.flatnonzero(ranked_scores[1:] != ranked_scores[:-1]) + 1, len(ranked_types))
+            tie_end = np.repeat(group_ends, np.diff(group_ends, prepend=0))
+            ranking = self._preferences[worker_idx] = (ranked_types, tie_end)
+        return ranking
+
+def solve_capacitated_assignment(scores, capacities):
+    """Maximum total score assignment of workers (rows) to columns that take up to capacities[j] workers.
+    
+    This is the linear sum assignment of the matrix with every column repeated capacities[j] times,
+    solved with scipy on only the column copies an optimum can be found in (see
+    _shortlisted_columns). A worker is only assigned when that adds a positive score. Returns the
+    column of every worker, -1 when unassigned.
+    """
+    # Imported here: scipy takes about half a second to load and only the optimal strategy needs it
+    from scipy.optimize import linear_sum_assignment
+    
+    scores = np.asarray(scores, dtype=float)
+    num_workers, num_columns = scores.shape
+    assignment = np.full(num_workers, -1)
+    if not scores.size:
+        return assignment
+    capacities = np.clip(np.asarray(capacities, dtype=np.int64), 0, num_workers)
+    if capacities.sum() <= 2 * num_columns:
+        # Mostly single places: the shortlist would cost more than it saves
+        expanded_columns = np.repeat(np.arange(num_columns), capacities)
+    else:
+        expanded_columns = _shortlisted_columns(scores, capacities)
+    
+    # Scores are clipped at zero, a worker placed at a zero is left unassigned; the padding gives
+    # linear_sum_assignment a place for every worker
+    expanded_scores = np.zeros((num_workers, max(num_workers, len(expanded_columns))))
+    np.maximum(scores[:, expanded_columns], 0, out=expanded_scores[:, :len(expanded_columns)])
+    rows, positions = linear_sum_assignment(expanded_scores, maximize=True)
+    placed = positions < len(expanded_columns)
+    assignment[rows[placed]] = expanded_columns[positions[placed]]
+    assignment[(assignment >= 0) & (scores[np.arange(num_workers), assignment] <= 0)] = -1
+    return assignment
+
+def _shortlisted_columns(scores, capacities):
+    """Column copies of the expanded matrix an optimum can be found in.
+    
+    The other workers fill at most num_workers - 1 places, so every worker has a free place in
+    the best of its columns that together hold num_workers places, which scores at least as much
+    as any column further down its ranking. There is therefore an optimum in which every worker
+    is in that shortlist (or unassigned), and a column needs no more copies than the workers
+    listing it.
+    """
+    num_workers, num_columns = scores.shape
+    # Columns without places or without a positive score are never worth listing
+    ranking_scores = np.where(capacities > 0, scores, -np.inf)
+    shortlist_length = min(num_columns, num_workers)
+    top = np.argpartition(-ranking_scores, shortlist_length - 1, axis=1)[:, :shortlist_length]
+    top_scores = np.take_along_axis(ranking_scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_capacity = capacities[top]
+    shortlisted = ((np.cumsum(top_capacity, axis=1) - top_capacity < num_workers)
+                   & (np.take_along_axis(top_scores, order, axis=1) > 0))
+    listing_workers = np.bincount(top[shortlisted], minlength=num_columns)
+    return np.repeat(np.arange(num_columns), np.minimum(capacities, listing_workers))
+
+def format_time(minutes):
+    """Convert simulation minutes to HH:MM format"""
+    hours_from_start = minutes // 60
+    mins_past_hour = minutes % 60
+    display_hour = 8 + hours_from_start
+    return f"{int(display_hour):02d}:{int(mins_past_hour):02d}"
+
+def get_task_group(task_id):
+    """Returns a generic task group ID (e.g., 'ST1' and 'SL1' both map to 'T1')"""
+    if task_id.startswith("ST"):
+        return f"T{task_id[2:]}"
+    elif task_id.startswith("SL"):
+        return f"T{task_id[2:]}"
+    elif task_id.startswith("BH"):
+        return f"T{task_id[2:]}"
+    return task_id # Fallback for other task IDs
+
+NOT_READY = np.iinfo(np.int64).max  # ReadyTaskTracker.ready_heads entry of a task type without ready units
+
+class ReadyTaskTracker:
+    """Incremental ready set of the pending units of an order, bucketed by requirement level.
+    
+    Pending units are not objects: every task type of the order keeps a counter of units not yet
+    started, and a TaskInstance is only created when a unit is handed to a worker. Units are
+    ordered as if one instance per unit had been listed product by product, unit by unit, task by
+    task; that position (the sequence) is computed from the counters and decides which unit is
+    picked first, and the n-th started unit of a task type becomes instance <task>_U<n>.
+    
+    A requirement is met once any task of the same group (see get_task_group) has a completed
+    unit, so readiness is tracked per task type: every type keeps a counter of unmet requirement
+    groups and only the types that depend on a newly satisfied group are touched.
+    
+    ready_heads holds the sequence of the next ready unit of every task type of the catalog
+    (NOT_READY when it has none) and is kept current as units start and types become ready, so
+    the Priority 3 fallback looks candidates up instead of collecting them.
+    """
+    def __init__(self, catalog, products_to_produce):
+        self.catalog = catalog
+        self.first_sequence = {}
+        self.sequence_stride = {}
+        self.remaining_units = {}
+        self.next_unit = {}
+        self.blocked_types = set()
+        self.unmet_counts = {}
+        self.satisfied_groups = np.zeros(len(catalog.group_names), dtype=bool)
+        self.ready_by_level = defaultdict(dict)
+        self.ready_counts = defaultdict(int)
+        self.total_units = 0
+        self.started_instances = []
+        self.product_quantities = {}
+        self.ready_heads = np.full(len(catalog.task_ids), NOT_READY, dtype=np.int64)
+        
+        for product_name, quantity in products_to_produce.items():
+            product_tasks = catalog.product_tasks.get(product_name, [])
+            if quantity <= 0 or not len(product_tasks):
+                continue
+            self.product_quantities[product_name] = quantity
+            for position, task_idx in enumerate(product_tasks.tolist()):
+                self.first_sequence[task_idx] = self.total_units + position
+                self.sequence_stride[task_idx] = len(product_tasks)
+                self.remaining_units[task_idx] = quantity
+                self.next_unit[task_idx] = 0
+            self.total_units += quantity * len(product_tasks)
+        
+        # ST1, SL1, BH1 tasks have no requirements - they can always start
+        for task_idx in self.remaining_units:
+            self.unmet_counts[task_idx] = len(catalog.requirement_groups_of(task_idx))
+            if self.unmet_counts[task_idx]:
+                self.blocked_types.add(task_idx)
+            else:
+                self._make_ready(task_idx)
+    
+    def _make_ready(self, task_idx):
+        self.blocked_types.discard(task_idx)
+        level = int(self.catalog.task_level[task_idx])
+        # A type whose units were all cancelled (see add_units) has nothing to offer
+        if self.remaining_units[task_idx]:
+            self.ready_by_level[level][task_idx] = True
+            self.ready_heads[task_idx] = self.head_sequence(task_idx)
+        self.ready_counts[level] += self.remaining_units[task_idx]
+    
+    def _change_pending(self, task_idx, count):
+        """Add count (negative to remove) pending units to a task type already in the order"""
+        self.remaining_units[task_idx] += count
+        if task_idx in self.blocked_types:
+            return
+        level = int(self.catalog.task_level[task_idx])
+        self.ready_counts[level] += count
+        if self.remaining_units[task_idx]:
+            self.ready_by_level[level][task_idx] = True
+            self.ready_heads[task_idx] = self.head_sequence(task_idx)
+        else:
+            self.ready_by_level[level].pop(task_idx, None)
+            self.ready_heads[task_idx] = NOT_READY
+    
+    def add_units(self, products_delta):
+        """Change the order by {product: units}; a negative count cancels units not yet started.
+        
+        Sequences are recomputed as if the new quantities had been ordered from the start, so
+        added units queue behind the units of their product already in the order and products new
+        to the order come last. Returns the change in total_units.
+        """
+        units_before = self.total_units
+        for product_name, delta in products_delta.items():
+            product_tasks = self.catalog.product_tasks.get(product_name, [])
+            if not delta or not len(product_tasks):
+                continue
+            if product_name not in self.product_quantities:
+                if delta < 0:
+                    continue
+                self.product_quantities[product_name] = 0
+                for task_idx in product_tasks.tolist():
+                    self.remaining_units[task_idx] = 0
+                    self.next_unit[task_idx] = 0
+                    self.first_sequence[task_idx] = 0  # Laid out below
+                    self.sequence_stride[task_idx] = len(product_tasks)
+                    unmet_groups = [group for group in self.catalog.requirement_groups_of(task_idx).tolist()
+                                    if not self.satisfied_groups[group]]
+                    self.unmet_counts[task_idx] = len(unmet_groups)
+                    if unmet_groups:
+                        self.blocked_types.add(task_idx)
+                    else:
+                        self._make_ready(task_idx)
+            
+            for task_idx in product_tasks.tolist():
+                count = delta if delta > 0 else -min(-delta, self.remaining_units[task_idx])
+                self._change_pending(task_idx, count)
+                self.total_units += count
+            self._update_quantity(product_name)
+        self._layout_sequences()
+        return self.total_units - units_before
+    
+    def requeue(self, task_instance):
+        """Put back a started unit that will not be finished; it is started again as a new unit"""
+        self._change_pending(task_instance.task_index, 1)
+        self._update_quantity(task_instance.product)
+        self._layout_sequences()
+    
+    def _update_quantity(self, product_name):
+        """Units a product spans: the most started plus pending units of any of its task types"""
+        self.product_quantities[product_name] = max(
+            self.next_unit[task_idx] + self.remaining_units[task_idx]
+            for task_idx in self.catalog.product_tasks[product_name].tolist()
+        )
+    
+    def _layout_sequences(self):
+        """Lay the products out one after the other again with their current quantities"""
+        offset = 0
+        for product_name, quantity in self.product_quantities.items():
+            product_tasks = self.catalog.product_tasks[product_name].tolist()
+            for position, task_idx in enumerate(product_tasks):
+                self.first_sequence[task_idx] = offset + position
+            offset += quantity * len(product_tasks)
+        for ready_types in self.ready_by_level.values():
+            for task_idx in ready_types:
+                self.ready_heads[task_idx] = self.head_sequence(task_idx)
+    
+    def pending_slots(self):
+        """Duration in slots of all units not started yet"""
+        return sum(self.remaining_units[task_idx] * self.catalog.task_sim_data[task_idx].duration_slot
+                   for task_idx in self.remaining_units)
+    
+    def mark_completed(self, task_idx):
+        """Record a completed unit of a task type and release the task types it unblocks"""
+        group = self.catalog.task_group[task_idx]
+        if self.satisfied_groups[group]:
+            return
+        self.satisfied_groups[group] = True
+        for dependent_idx in self.catalog.dependents_of(group).tolist():
+            if dependent_idx in self.blocked_types:
+                self.unmet_counts[dependent_idx] -= 1
+                if not self.unmet_counts[dependent_idx]:
+                    self._make_ready(dependent_idx)
+    
+    def has_ready_tasks(self):
+        return any(self.ready_counts.values())
+    
+    def ready_levels(self):
+        """Levels that currently have ready units, highest first"""
+        return sorted((level for level, count in self.ready_counts.items() if count), reverse=True)
+    
+    def level_count(self, level):
+        return self.ready_counts.get(level, 0)
+    
+    def head_sequence(self, task_idx):
+        """Sequence of the next unit of a task type"""
+        return self.first_sequence[task_idx] + self.next_unit[task_idx] * self.sequence_stride[task_idx]
+    
+    def pop_earliest(self, level, count):
+        """Start and return the first `count` ready units of a level in sequence order"""
+        ready_types = self.ready_by_level.get(level)
+        if not ready_types or count <= 0:
+            return []
+        heads = [(self.head_sequence(task_idx), task_idx) for task_idx in ready_types]
+        heapq.heapify(heads)
+        taken = []
+        while heads and len(taken) < count:
+            _, task_idx = heapq.heappop(heads)
+            taken.append(self.pop_type(task_idx))
+            if task_idx in ready_types:
+                heapq.heappush(heads, (self.head_sequence(task_idx), task_idx))
+        return taken
+    
+    def ready_type_counts(self):
+        """Yield (task type, number of ready units) for every task type with ready units"""
+        for ready_types in self.ready_by_level.values():
+            for task_idx in ready_types:
+                yield task_idx, self.remaining_units[task_idx]
+    
+    def pop_type(self, task_idx):
+        """Start the next ready unit of a task type and return its new TaskInstance"""
+        level = int(self.catalog.task_level[task_idx])
+        unit_idx = self.next_unit[task_idx]
+        self.next_unit[task_idx] += 1
+        self.remaining_units[task_idx] -= 1
+        if self.remaining_units[task_idx]:
+            self.ready_heads[task_idx] = self.head_sequence(task_idx)
+        else:
+            del self.ready_by_level[level][task_idx]
+            self.ready_heads[task_idx] = NOT_READY
+        self.ready_counts[level] -= 1
+        
+        task_instance = TaskInstance(self.catalog.task_sim_data[task_idx], unit_idx + 1)
+        self.started_instances.append(task_instance)
+        return task_instance
+
+# Simulation log event kinds
+EVENT_COMPLETED = 0
+EVENT_QUOTA_START = 1      # Priority 1/2 start, logged with its level and skill match
+EVENT_EARLIEST_START = 2   # Priority 1/2 start of the earliest task in the order
+EVENT_FALLBACK_START = 3   # Priority 3 start
+EVENT_INTERRUPTED = 4      # Unit given up because its worker left (see resume_simulation)
+LOG_VERBOSITY = ("off", "summary", "full")
+
+class SimulationLog:
+    """Event stream of a simulation, stored as compact tuples and formatted only when displayed.
+    
+    Each event is (time_minutes, worker_idx, task_idx, unit, kind, level, score): the instance is
+    identified by its task type index and unit number (TaskInstance.instance_idx), level is the
+    quota level of a Priority 1/2 start (-1 otherwise) and score the skill match of a start.
+    
+    verbosity="full" records every start and completion, "summary" only completions and "off"
+    nothing. max_events keeps just the most recent events in a ring buffer.
+    """
+    def __init__(self, worker_names, task_ids, assignment_strategy="greedy", verbosity="full", max_events=None):
+        if verbosity not in LOG_VERBOSITY:
+            raise ValueError(f"Unknown log verbosity: {verbosity}")
+        self.worker_names = list(worker_names)
+        self.task_ids = task_ids
+        self.assignment_strategy = assignment_strategy
+        self.verbosity = verbosity
+        self.max_events = max_events
+        self.events = deque(maxlen=max_events) if max_events else []
+        self.record_completions = verbosity != "off"
+        self.record_starts = verbosity == "full"
+    
+    def started(self, current_time_minutes, worker, task, kind, level=-1, score=0.0):
+        if self.record_starts:
+            self.events.append((current_time_minutes, worker.worker_index, task.task_index, task.instance_idx,
+                                kind, level, float(score)))
+    
+    def completed(self, current_time_minutes, worker, task):
+        if self.record_completions:
+            self.events.append((current_time_minutes, worker.worker_index, task.task_index, task.instance_idx,
+                                EVENT_COMPLETED, -1, 0.0))
+    
+    def interrupted(self, current_time_minutes, worker, task):
+        if self.record_completions:
+            self.events.append((current_time_minutes, worker.worker_index, task.task_index, task.instance_idx,
+                                EVENT_INTERRUPTED, -1, 0.0))
+    
+    def add_workers(self, worker_names):
+        self.worker_names.extend(worker_names)
+    
+    def __deepcopy__(self, memo):
+        # Events are immutable tuples, so a copy only needs its own container
+        copied = copy.copy(self)
+        copied.worker_names = list(self.worker_names)
+        copied.events = deque(self.events, maxlen=self.max_events) if self.max_events else list(self.events)
+        return copied
+    
+    def __len__(self):
+        return len(self.events)
+    
+    def __iter__(self):
+        return iter(self.events)
+    
+    def format_event(self, event):
+        current_time_minutes, worker_idx, task_idx, unit, kind, level, score = event
+        worker_name = self.worker_names[worker_idx]
+        instance_id = f"{self.task_ids[task_idx]}_U{unit}"
+        if kind == EVENT_COMPLETED:
+            return f"Worker {worker_name} completed {instance_id}"
+        if kind == EVENT_INTERRUPTED:
+            return f"Worker {worker_name} left, {instance_id} goes back to the queue"
+        
+        note = ", optimal matching" if self.assignment_strategy == "optimal" else ""
+        if kind == EVENT_EARLIEST_START:
+            reason = f"earliest task priority{note}"
+        elif kind == EVENT_QUOTA_START:
+            reason = f"level {level}, skill: {score:.2f}{note}"
+        else:
+            reason = f"fallback assignment{note}"
+        return f"Worker {worker_name} started {instance_id} ({reason})"
+    
+    def to_dataframe(self):
+        """Time / Event table of the recorded events, formatted for display"""
+        return pd.DataFrame({
+            "time": [format_time(event[0]) for event in self.events],
+            "event": [self.format_event(event) for event in self.events],
+        })
+
+SIMULATION_PHASES = ("setup", "progress_update", "readiness_update", "prioritization", "level_assignment",
+                     "fallback", "optimal_matching", "schedule_recording")
+
+class SimulationProfile:
+    """Cumulative time and call count per simulation phase, plus run counters.
+    
+    start() returns a perf_counter timestamp and stop(phase, started) adds the time since it to
+    the phase. A disabled profile returns from both immediately, so the hooks can stay in the loop.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phase_seconds = dict.fromkeys(SIMULATION_PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(SIMULATION_PHASES, 0)
+        self.counters = {"ticks": 0, "decision_points": 0, "idle_ticks": 0, "assignments": 0,
+                         "fallback_assignments": 0, "completions": 0}
+    
+    def start(self):
+        return time.perf_counter() if self.enabled else 0.0
+    
+    def stop(self, phase, started):
+        if self.enabled:
+            self.phase_seconds[phase] += time.perf_counter() - started
+            self.phase_calls[phase] += 1
+    
+    def count(self, counter, amount=1):
+        if self.enabled:
+            self.counters[counter] += amount
+    
+    def summary(self, total_seconds):
+        """Plain dict for the result: phase table, counters and total run time"""
+        return {
+            "total_seconds": total_seconds,
+            "phases": {phase: {"seconds": self.phase_seconds[phase], "calls": self.phase_calls[phase]}
+                       for phase in SIMULATION_PHASES if self.phase_calls[phase]},
+            "counters": dict(self.counters),
+        }
+
+_NO_PROFILE = SimulationProfile(enabled=False)
+
+class WorkerProgressKernel:
+    """Progress of the tasks being worked on, kept as arrays indexed by worker_index.
+    
+    remaining holds the minutes left on each worker's task, progress its completion percentage and
+    task_index the task type being worked on (-1 for an idle worker, ScheduleGrid.ABSENT for one
+    who left a resumed simulation). advance() moves every busy
+    worker forward one slot in a single array operation (tick clock); due() returns the workers
+    whose expected completion time has been reached (event clock). Both return worker indices in
+    ascending order, which is the order the tasks are completed in.
+    
+    The worker and task instance objects are only written back by sync() at the end of a run.
+    """
+    def __init__(self, num_workers):
+        self.remaining = np.zeros(num_workers)
+        self.progress = np.zeros(num_workers)
+        self.progress_step = np.zeros(num_workers)
+        self.duration_slot = np.zeros(num_workers)
+        self.completion_time = np.full(num_workers, np.inf)
+        self.task_index = np.full(num_workers, -1, dtype=np.int32)
+    
+    def start(self, workers):
+        """Load the tasks the given workers were just assigned to (see assign_worker_to_task)"""
+        if not workers:
+            return
+        idx = [worker.worker_index for worker in workers]
+        task_sim_data = [worker.current_task_instance.task_sim_data for worker in workers]
+        self.duration_slot[idx] = [task.duration_slot for task in task_sim_data]
+        self.remaining[idx] = [worker.time_remaining_on_task for worker in workers]
+        self.progress[idx] = [worker.current_task_instance.progress_percentage for worker in workers]
+        self.progress_step[idx] = 100 / self.duration_slot[idx]
+        self.completion_time[idx] = [worker.expected_completion_time for worker in workers]
+        self.task_index[idx] = [task.task_index for task in task_sim_data]
+    
+    def finish(self, worker_indices):
+        self.remaining[worker_indices] = 0
+        self.completion_time[worker_indices] = np.inf
+        self.task_index[worker_indices] = -1
+    
+    def advance(self, slot_duration_minutes):
+        """Advance every busy worker by one slot and return the workers whose task is done"""
+        busy = self.task_index >= 0
+        np.subtract(self.remaining, slot_duration_minutes, out=self.remaining, where=busy)
+        np.minimum(self.progress + self.progress_step, 100, out=self.progress, where=busy)
+        return np.flatnonzero(busy & (self.remaining <= 0))
+    
+    def idle_workers(self):
+        return np.flatnonzero(self.task_index == -1)
+    
+    def add_workers(self, count):
+        """Append count idle workers"""
+        self.remaining = np.append(self.remaining, np.zeros(count))
+        self.progress = np.append(self.progress, np.zeros(count))
+        self.progress_step = np.append(self.progress_step, np.zeros(count))
+        self.duration_slot = np.append(self.duration_slot, np.zeros(count))
+        self.completion_time = np.append(self.completion_time, np.full(count, np.inf))
+        self.task_index = np.append(self.task_index, np.full(count, -1, dtype=np.int32))
+    
+    def set_absent(self, worker_idx, absent):
+        """Take a worker out of (or back into) the pool; an absent worker is never idle or busy"""
+        self.finish([worker_idx])
+        if absent:
+            self.task_index[worker_idx] = ScheduleGrid.ABSENT
+    
+    def due(self, current_time_minutes):
+        return np.flatnonzero(self.completion_time <= current_time_minutes)
+    
+    def next_completion_time(self, workers):
+        """Earliest expected completion time of a running task, or None when every worker is idle"""
+        if not len(self.completion_time):
+            return None
+        idx = int(self.completion_time.argmin())
+        if self.task_index[idx] < 0:
+            return None
+        return workers[idx].expected_completion_time
+    
+    def settle(self, last_tick_minutes, slot_duration_minutes, workers):
+        """Set running tasks to the state the tick clock leaves them in at last_tick_minutes"""
+        busy = np.flatnonzero(self.task_index >= 0)
+        start_times = np.array([workers[idx].current_task_instance.start_time_minutes for idx in busy], dtype=float)
+        elapsed_slots = (last_tick_minutes - start_times) // slot_duration_minutes
+        self.remaining[busy] = self.duration_slot[busy] * slot_duration_minutes - elapsed_slots * slot_duration_minutes
+        self.progress[busy] = np.minimum(100, elapsed_slots * self.progress_step[busy])
+    
+    def sync(self, workers):
+        """Write remaining time and progress back to the busy workers and their task instances"""
+        for idx in np.flatnonzero(self.task_index >= 0):
+            worker = workers[idx]
+            worker.time_remaining_on_task = float(self.remaining[idx])
+            worker.current_task_instance.progress_percentage = float(self.progress[idx])
+
+def assign_worker_to_task(worker, task, current_time_minutes, slot_duration_minutes):
+    """Assign a worker to a task"""
+    worker.is_available = False
+    worker.current_task_instance = task
+    worker.time_remaining_on_task = task.duration_slot * slot_duration_minutes
+    worker.expected_completion_time = current_time_minutes + max(1, math.ceil(task.duration_slot)) * slot_duration_minutes
+    
+    task.status = "in_progress"
+    task.assigned_worker_name = worker.name
+    task.start_time_minutes = current_time_minutes
+
+def complete_worker_task(worker, current_time_minutes, inventory, ready_tracker, simulation_log):
+    """Mark the worker's current task as completed and free the worker"""
+    task_instance = worker.current_task_instance
+    task_instance.status = "completed"
+    task_instance.progress_percentage = 100.0
+    task_instance.completion_time_minutes = current_time_minutes
+    inventory[task_instance.task_id] += 1
+    ready_tracker.mark_completed(task_instance.task_index)
+    
+    worker.is_available = True
+    worker.current_task_instance = None
+    worker.time_remaining_on_task = 0
+    
+    simulation_log.completed(current_time_minutes, worker, task_instance)
+
+def interrupt_worker_task(worker, current_time_minutes, slot_duration_minutes, ready_tracker, simulation_log):
+    """Give up the worker's current task (status "interrupted") and queue its unit again"""
+    task_instance = worker.current_task_instance
+    task_instance.status = "interrupted"
+    task_instance.completion_time_minutes = current_time_minutes
+    task_instance.progress_percentage = min(100.0, 100.0 * (current_time_minutes - task_instance.start_time_minutes)
+                                            / (task_instance.duration_slot * slot_duration_minutes))
+    ready_tracker.requeue(task_instance)
+    simulation_log.interrupted(current_time_minutes, worker, task_instance)
+    
+    worker.current_task_instance = None
+    worker.time_remaining_on_task = 0
+
+def take_level_quotas(ready_tracker, num_workers):
+    """Pop the instances the level balancing rules reserve for num_workers available workers.
+    
+    Returns (level, tasks, earliest_priority) blocks in assignment order: the Priority 1 block of
+    earliest (level 0) tasks first, then the Priority 2 blocks from the highest level down.
+    """
+    blocks = []
+    if not num_workers or not ready_tracker.has_ready_tasks():
+        return blocks
+    
+    # Identify task progression opportunities (levels with ready tasks, highest first)
+    ready_levels = ready_tracker.ready_levels()
+    
+    # Priority 1: Ensure earliest tasks (level 0) have sufficient workers
+    workers_for_level_0 = max(1, num_workers // 2)  # At least half workers on earliest tasks
+    level_0_tasks = ready_tracker.pop_earliest(0, min(workers_for_level_0, num_workers))
+    if level_0_tasks:
+        blocks.append((0, level_0_tasks, True))
+    
+    # Priority 2: Assign remaining workers to highest available task level
+    remaining_workers = num_workers - len(level_0_tasks)
+    for level in ready_levels:
+        if not remaining_workers:
+            break
+        
+        # Assign workers to this level, but leave some for lower levels if needed
+        if level > 0:
+            # For higher levels, assign fewer workers to maintain balance
+            workers_for_this_level = min(remaining_workers // 2, ready_tracker.level_count(level))
+        else:
+            # For level 0, assign all remaining workers
+            workers_for_this_level = min(remaining_workers, ready_tracker.level_count(level))
+        
+        level_tasks = ready_tracker.pop_earliest(level, workers_for_this_level)
+        if level_tasks:
+            blocks.append((level, level_tasks, False))
+            remaining_workers -= len(level_tasks)
+    
+    return blocks
+
+def log_task_start(simulation_log, worker, task, current_time_minutes, level, earliest_priority, skill_score):
+    """Record the start event of a quota (Priority 1 and 2) assignment"""
+    kind = EVENT_EARLIEST_START if earliest_priority else EVENT_QUOTA_START
+    simulation_log.started(current_time_minutes, worker, task, kind, level, skill_score)
+
+def first_ready_position(ranked_types, ready_heads, probe=16):
+    """Position of the first task type in ranked_types that has a ready unit (there must be one).
+    
+    The top `probe` types are checked first, which is where a worker usually finds one while many
+    types are ready; otherwise the whole ranking is checked in one array operation.
+    """
+    ready = ready_heads[ranked_types[:probe]] != NOT_READY
+    position = int(ready.argmax())
+    if ready[position]:
+        return position
+    return int((ready_heads[ranked_types] != NOT_READY).argmax())
+
+def run_assignment_pass(worker_sim_data_map, ready_tracker, skill_matrix, current_time_minutes, slot_duration_minutes,
+                        simulation_log, assignment_strategy="greedy", available_workers=None, profile=None):
+    """Run the assignment rules once at a decision point and return the newly assigned workers
+    
+    available_workers, in worker order, saves the scan of worker_sim_data_map when the caller
+    already knows which workers are idle. profile is the SimulationProfile the phases are timed in.
+    """
+    profile = profile or _NO_PROFILE
+    # Get available workers and check there is anything to start
+    if available_workers is None:
+        available_workers = [w for w in worker_sim_data_map.values() if w.is_available]
+    if not available_workers or not ready_tracker.has_ready_tasks():
+        return []
+    
+    # Smart worker assignment based on progression strategy
+    phase_started = profile.start()
+    quota_blocks = take_level_quotas(ready_tracker, len(available_workers))
+    profile.stop("prioritization", phase_started)
+    if assignment_strategy == "optimal":
+        phase_started = profile.start()
+        newly_assigned = run_optimal_matching(available_workers, quota_blocks, ready_tracker, skill_matrix,
+                                              current_time_minutes, slot_duration_minutes, simulation_log)
+        profile.stop("optimal_matching", phase_started)
+        profile.count("assignments", len(newly_assigned))
+        return newly_assigned
+    
+    # Greedy: quota tasks go to the available workers in list order
+    phase_started = profile.start()
+    newly_assigned = []
+    for level, level_tasks, earliest_priority in quota_blocks:
+        for task in level_tasks:
+            worker = available_workers[len(newly_assigned)]
+            assign_worker_to_task(worker, task, current_time_minutes, slot_duration_minutes)
+            newly_assigned.append(worker)
+            log_task_start(simulation_log, worker, task, current_time_minutes, level, earliest_priority,
+                           skill_matrix.skill_match[worker.worker_index, task.task_index])
+    
+    remaining_workers = available_workers[len(newly_assigned):]
+    profile.stop("level_assignment", phase_started)
+    profile.count("assignments", len(newly_assigned))
+    
+    # Priority 3: Assign any remaining workers to best available tasks
+    if not remaining_workers or not ready_tracker.has_ready_tasks():
+        return newly_assigned
+    
+    phase_started = profile.start()
+    num_quota_assigned = len(newly_assigned)
+    
+    # Units of one task type score the same, so only the next ready unit of each type is a
+    # candidate. Each worker walks their ranked task types (SkillMatchMatrix.preferences) to the
+    # first one with a ready unit; among the types tied with it the unit that comes first in the
+    # order wins.
+    ready_heads = ready_tracker.ready_heads
+    for worker in remaining_workers:
+        if not ready_tracker.has_ready_tasks():
+            break
+        # Find best task for this worker based on skill match
+        ranked_types, tie_end = skill_matrix.preferences(worker.worker_index)
+        position = first_ready_position(ranked_types, ready_heads)
+        if skill_matrix.assignment_score[worker.worker_index, ranked_types[position]] <= 0:
+            continue
+        
+        tied = ranked_types[position:tie_end[position]]
+        best_type = int(tied[np.argmin(ready_heads[tied])])
+        best_task = ready_tracker.pop_type(best_type)
+        assign_worker_to_task(worker, best_task, current_time_minutes, slot_duration_minutes)
+        newly_assigned.append(worker)
+        
+        simulation_log.started(current_time_minutes, worker, best_task, EVENT_FALLBACK_START,
+                               score=skill_matrix.skill_match[worker.worker_index, best_type])
+    
+    profile.stop("fallback", phase_started)
+    profile.count("assignments", len(newly_assigned) - num_quota_assigned)
+    profile.count("fallback_assignments", len(newly_assigned) - num_quota_assigned)
+    return newly_assigned
+
+def run_optimal_matching(available_workers, quota_blocks, ready_tracker, skill_matrix, current_time_minutes,
+                         slot_duration_minutes, simulation_log):
+    """Assign the available workers by solving one assignment problem for the decision point.
+    
+    The level quotas are kept: every instance reserved by take_level_quotas gets a worker, but which
+    worker does which reserved task, and which ready tasks the workers left over take instead of the
+    Priority 3 fallback, is chosen to maximize the total skill x favorite score.
+    """
+    worker_rows = np.array([worker.worker_index for worker in available_workers])
+    
+    # Columns: one per (quota block, task type) with the number of reserved instances as capacity,
+    # then one per ready task type for the fallback with the number of ready instances
+    columns = []
+    quota_tasks = []
+    for level, level_tasks, earliest_priority in quota_blocks:
+        tasks_by_type = defaultdict(list)
+        for task in level_tasks:
+            tasks_by_type[task.task_index].append(task)
+        for task_idx, tasks in tasks_by_type.items():
+            columns.append(task_idx)
+            quota_tasks.append((level, tasks, earliest_priority))
+    num_quota_columns = len(columns)
+    num_fallback_workers = len(available_workers) - sum(len(tasks) for _, tasks, _ in quota_tasks)
+    capacities = [len(tasks) for _, tasks, _ in quota_tasks]
+    if num_fallback_workers > 0:
+        for task_idx, count in ready_tracker.ready_type_counts():
+            columns.append(task_idx)
+            capacities.append(min(count, num_fallback_workers))
+    if not columns:
+        return []
+    
+    scores = skill_matrix.assignment_score[np.ix_(worker_rows, columns)]
+    # Reserved instances must all be staffed, so they outrank any gain on the fallback columns
+    quota_bonus = 1.0 + 2.0 * len(available_workers) * max(1.0, float(np.abs(scores).max()))
+    scores[:, :num_quota_columns] += quota_bonus
+    assignment = solve_capacitated_assignment(scores, capacities)
+    
+    newly_assigned = []
+    for column, (level, tasks, earliest_priority) in enumerate(quota_tasks):
+        for worker_pos, task in zip(np.flatnonzero(assignment == column), tasks):
+            worker = available_workers[worker_pos]
+            assign_worker_to_task(worker, task, current_time_minutes, slot_duration_minutes)
+            newly_assigned.append(worker)
+            log_task_start(simulation_log, worker, task, current_time_minutes, level, earliest_priority,
+                           skill_matrix.skill_match[worker.worker_index, task.task_index])
+    
+    for worker_pos in np.flatnonzero(assignment >= num_quota_columns):
+        worker = available_workers[worker_pos]
+        task = ready_tracker.pop_type(columns[assignment[worker_pos]])
+        assign_worker_to_task(worker, task, current_time_minutes, slot_duration_minutes)
+        newly_assigned.append(worker)
+        simulation_log.started(current_time_minutes, worker, task, EVENT_FALLBACK_START,
+                               score=skill_matrix.skill_match[worker.worker_index, task.task_index])
+    
+    return newly_assigned
+
+class ScheduleGrid:
+    """Schedule of a simulation as a day x worker x slot array of task type codes.
+    
+    codes[day - 1, worker_index, slot] is the catalog task index a worker is busy with, IDLE (-1),
+    ABSENT (-3) while the worker is not part of a resumed simulation, or NOT_RECORDED (-2) for
+    slots the simulation never reached; slot_ticks holds the simulation tick (time // slot
+    duration) each recorded slot was taken at.
+    
+    The inventory is kept as sparse deltas: one (tick, task index, count) entry per task type
+    completed in a tick, in completion order. inventory_at() rebuilds the inventory of any slot.
+    Labels are built by day_frame() / export_frame() when a day is shown.
+    """
+    IDLE = -1
+    NOT_RECORDED = -2
+    ABSENT = -3
+    INVENTORY_COLUMN = "Available semi-finished tasks"
+    
+    def __init__(self, worker_names, task_ids, task_labels, num_days, slot_duration_minutes):
+        self.worker_names = list(worker_names)
+        self.task_ids = list(task_ids)
+        self.task_labels = list(task_labels)
+        self.slot_duration_minutes = slot_duration_minutes
+        self.slots_per_day = math.ceil(8 * 60 / slot_duration_minutes)
+        self.codes = np.full((num_days, len(self.worker_names), self.slots_per_day), self.NOT_RECORDED, dtype=np.int32)
+        self.slot_ticks = np.full((num_days, self.slots_per_day), self.NOT_RECORDED, dtype=np.int64)
+        self.delta_ticks = []
+        self.delta_tasks = []
+        self.delta_counts = []
+    
+    @property
+    def num_days(self):
+        return self.codes.shape[0]
+    
+    def add_workers(self, worker_names):
+        """Append workers; the slots before they joined stay NOT_RECORDED"""
+        self.worker_names.extend(worker_names)
+        new_codes = np.full((self.num_days, len(worker_names), self.slots_per_day), self.NOT_RECORDED, dtype=np.int32)
+        self.codes = np.concatenate([self.codes, new_codes], axis=1)
+    
+    def extend_days(self, num_days):
+        """Grow the grid to num_days days"""
+        extra_days = num_days - self.num_days
+        if extra_days <= 0:
+            return
+        self.codes = np.concatenate([self.codes, np.full((extra_days,) + self.codes.shape[1:], self.NOT_RECORDED,
+                                                         dtype=np.int32)])
+        self.slot_ticks = np.concatenate([self.slot_ticks, np.full((extra_days, self.slots_per_day), self.NOT_RECORDED,
+                                                                   dtype=np.int64)])
+    
+    def record(self, start_minutes, end_minutes, worker_codes):
+        """Write the same worker codes into every slot in [start_minutes, end_minutes)"""
+        times = np.arange(start_minutes, end_minutes, self.slot_duration_minutes)
+        days = times // (8 * 60)
+        slots = (times % (8 * 60)) // self.slot_duration_minutes
+        self.codes[days, :, slots] = worker_codes
+        self.slot_ticks[days, slots] = times // self.slot_duration_minutes
+    
+    def record_completions(self, current_time_minutes, task_indices):
+        """Add the task types completed at current_time_minutes to the inventory deltas"""
+        counts = {}
+        for task_idx in task_indices:
+            counts[task_idx] = counts.get(task_idx, 0) + 1
+        tick = current_time_minutes // self.slot_duration_minutes
+        for task_idx, count in counts.items():
+            self.delta_ticks.append(tick)
+            self.delta_tasks.append(int(task_idx))
+            self.delta_counts.append(count)
+    
+    def recorded_days(self):
+        return [day + 1 for day in np.flatnonzero((self.slot_ticks >= 0).any(axis=1))]
+    
+    def _inventory_counts(self, ticks):
+        """Inventory count of every task type (columns) after each of the given ticks (rows)"""
+        delta_ticks = np.asarray(self.delta_ticks, dtype=np.int64)
+        delta_tasks = np.asarray(self.delta_tasks, dtype=np.int64)
+        delta_counts = np.asarray(self.delta_counts, dtype=np.int64)
+        ends = np.searchsorted(delta_ticks, ticks, side="right")
+        counts = np.zeros((len(ticks), len(self.task_ids)), dtype=np.int64)
+        for end in np.unique(ends):
+            counts[ends == end] = np.bincount(delta_tasks[:end], weights=delta_counts[:end],
+                                              minlength=len(self.task_ids)).astype(np.int64)
+        return counts
+    
+    def _inventory_order(self):
+        """Task types in the order they first entered the inventory"""
+        return list(dict.fromkeys(self.delta_tasks))
+    
+    def inventory_at(self, day, slot):
+        """Inventory {task_id: count} at a recorded slot, None if the slot was not recorded"""
+        tick = self.slot_ticks[day - 1, slot]
+        if tick < 0:
+            return None
+        counts = self._inventory_counts(np.array([tick]))[0]
+        return {self.task_ids[task_idx]: int(counts[task_idx]) for task_idx in self._inventory_order()
+                if counts[task_idx] > 0}
+    
+    def day_frame(self, day):
+        """Display table of one day: a TIME column plus one column per worker and the inventory,
+        sorted by name, for the slots up to the last one recorded. None for an unrecorded day."""
+        recorded_slots = np.flatnonzero(self.slot_ticks[day - 1] >= 0)
+        if not len(recorded_slots):
+            return None
+        num_slots = recorded_slots[-1] + 1
+        
+        # Code -1 (idle) picks the trailing "idle" label and -2 the "absent" one before it;
+        # unrecorded slots show as idle too
+        label_table = np.array(self.task_labels + ["absent", "idle"], dtype=object)
+        day_codes = self.codes[day - 1, :, :num_slots]
+        day_codes = np.where(day_codes == self.NOT_RECORDED, self.IDLE, day_codes)
+        worker_labels = label_table[np.where(day_codes == self.ABSENT, -2, day_codes)]
+        
+        day_ticks = self.slot_ticks[day - 1, :num_slots]
+        counts = self._inventory_counts(day_ticks)
+        inventory_order = self._inventory_order()
+        inventory_labels = []
+        for tick, slot_counts in zip(day_ticks, counts):
+            if tick < 0:
+                inventory_labels.append("")
+                continue
+            label = ", ".join([f"{self.task_ids[task_idx]} {slot_counts[task_idx]} pcs" for task_idx in inventory_order
+                               if slot_counts[task_idx] > 0])
+            inventory_labels.append(label or "None, just started")
+        
+        # slot x worker pivot of the labels, columns sorted by name after the TIME column
+        frame = pd.DataFrame(worker_labels.T, columns=self.worker_names)
+        frame[self.INVENTORY_COLUMN] = inventory_labels
+        frame = frame[sorted(frame.columns)]
+        frame.insert(0, "TIME", [format_time(slot * self.slot_duration_minutes) for slot in range(num_slots)])
+        return frame
+    
+    def export_frame(self):
+        """Every recorded day in long format: Day, TIME, Worker and Task columns"""
+        frames = []
+        for day in self.recorded_days():
+            day_df = self.day_frame(day).melt(id_vars="TIME", var_name="Worker", value_name="Task")
+            day_df.insert(0, "Day", day)
+            frames.append(day_df)
+        if not frames:
+            return pd.DataFrame(columns=["Day", "TIME", "Worker", "Task"])
+        return pd.concat(frames, ignore_index=True)
+
+# --- Core Scheduling Logic ---
+ASSIGNMENT_STRATEGIES = {"greedy": "Greedy", "optimal": "Optimal matching"}
+
+class SimulationState:
+    """Everything the simulation loop reads and writes, so a run can be paused at a slot and resumed.
+    
+    run() advances the clock until every unit is done, the horizon is reached or the clock gets to
+    stop_minutes; result() builds the result dict of assign_tasks. copy() gives an independent
+    state to resume from (see SimulationCheckpoint); change_workers() and change_order() edit a
+    paused state.
+    """
+    def __init__(self, products_to_produce, available_workers_df, catalog, slot_duration_minutes=30,
+                 clock_mode="event", assignment_strategy="greedy", record_schedule=True, log_verbosity="full",
+                 log_max_events=None, seed=0):
+        self.catalog = catalog
+        self.slot_duration_minutes = slot_duration_minutes
+        self.clock_mode = clock_mode
+        self.assignment_strategy = assignment_strategy
+        self.record_schedule = record_schedule
+        self.rng = np.random.default_rng(seed)
+        self.worker_sim_data_map = {row["Worker"]: WorkerSimulationData(row, self.rng)
+                                    for _, row in available_workers_df.iterrows()}
+        worker_order = {worker_name: idx for idx, worker_name in enumerate(self.worker_sim_data_map)}
+        for worker_name, worker_data in self.worker_sim_data_map.items():
+            worker_data.worker_index = worker_order[worker_name]
+        self.workers = list(self.worker_sim_data_map.values())
+        self.skill_matrix = SkillMatchMatrix(self.workers, catalog)
+        
+        # Pending units are counted per task type; TaskInstance objects are created as units start
+        self.ready_tracker = ReadyTaskTracker(catalog, products_to_produce)
+        
+        # Calculate simulation parameters
+        total_task_slots = sum(catalog.product_task_slots.get(product_name, 0) * quantity
+                               for product_name, quantity in products_to_produce.items())
+        total_worker_slots_per_day = len(available_workers_df) * (8 * 60 / slot_duration_minutes)
+        self.estimated_days = max(1, math.ceil(total_task_slots / total_worker_slots_per_day))
+        
+        # Simulation state
+        self.current_time_minutes = 0
+        self.max_simulation_time = self.estimated_days * 8 * 60  # 8 hours per day
+        self.inventory = defaultdict(int)
+        self.completed_count = 0
+        self.finished = False
+        self.progress_kernel = WorkerProgressKernel(len(self.workers))
+        
+        # Schedule tracking
+        self.schedule = None
+        if record_schedule:
+            task_labels = [f"[{task.task_id}] {task.description}" for task in catalog.task_sim_data]
+            self.schedule = ScheduleGrid(self.worker_sim_data_map, catalog.task_ids, task_labels, self.estimated_days,
+                                         slot_duration_minutes)
+        self.simulation_log = SimulationLog(self.worker_sim_data_map, catalog.task_ids, assignment_strategy,
+                                            log_verbosity, log_max_events)
+    
+    def copy(self):
+        """Independent copy; the catalog, skill matrix and finished task instances are shared"""
+        return copy.deepcopy(self, {id(self.catalog): self.catalog, id(self.skill_matrix): self.skill_matrix})
+    
+    def _complete(self, completed_workers):
+        """Complete the tasks of the given workers at the current time"""
+        if self.record_schedule and len(completed_workers):
+            self.schedule.record_completions(self.current_time_minutes,
+                                             self.progress_kernel.task_index[completed_workers])
+        for worker_idx in completed_workers:
+            complete_worker_task(self.workers[worker_idx], self.current_time_minutes, self.inventory,
+                                 self.ready_tracker, self.simulation_log)
+        self.progress_kernel.finish(completed_workers)
+        self.completed_count += len(completed_workers)
+    
+    def run(self, profile=None, stop_minutes=None):
+        """Run the simulation loop from the current time.
+        
+        With stop_minutes (a multiple of the slot duration) the loop pauses when the clock
+        reaches it, before anything at that time is processed; run() can be called again later.
+        """
+        simulation_profile = profile or _NO_PROFILE
+        slot_duration_minutes = self.slot_duration_minutes
+        progress_kernel = self.progress_kernel
+        ready_tracker = self.ready_tracker
+        workers = self.workers
+        
+        while not self.finished and self.current_time_minutes < self.max_simulation_time:
+            current_time_minutes = self.current_time_minutes
+            if stop_minutes is not None and current_time_minutes >= stop_minutes:
+                return
+            
+            # Update worker progress
+            phase_started = simulation_profile.start()
+            if self.clock_mode == "tick":
+                completed_workers = progress_kernel.advance(slot_duration_minutes)
+            else:
+                completed_workers = progress_kernel.due(current_time_minutes)
+            simulation_profile.stop("progress_update", phase_started)
+            
+            phase_started = simulation_profile.start()
+            self._complete(completed_workers)
+            simulation_profile.stop("readiness_update", phase_started)
+            
+            newly_assigned = []
+            if ready_tracker.has_ready_tasks():
+                newly_assigned = run_assignment_pass(
+                    self.worker_sim_data_map, ready_tracker, self.skill_matrix, current_time_minutes,
+                    slot_duration_minutes, self.simulation_log, self.assignment_strategy,
+                    [workers[idx] for idx in progress_kernel.idle_workers()], simulation_profile
+                )
+            progress_kernel.start(newly_assigned)
+            
+            simulation_profile.count("ticks")
+            simulation_profile.count("decision_points")
+            simulation_profile.count("completions", len(completed_workers))
+            if not len(completed_workers) and not newly_assigned:
+                simulation_profile.count("idle_ticks")
+            
+            # Record schedule and inventory
+            if self.record_schedule:
+                phase_started = simulation_profile.start()
+                self.schedule.record(current_time_minutes, current_time_minutes + slot_duration_minutes,
+                                     progress_kernel.task_index)
+                simulation_profile.stop("schedule_recording", phase_started)
+            
+            # Check if all tasks are completed
+            if self.completed_count >= ready_tracker.total_units:
+                self.finished = True
+                break
+            
+            if self.clock_mode == "tick":
+                # Advance time
+                self.current_time_minutes += slot_duration_minutes
+                continue
+            
+            # A pass that assigned nobody leaves the state unchanged, so nothing can happen
+            # until the next completion. After a pass that did assign, re-evaluate next slot.
+            if newly_assigned:
+                next_time_minutes = current_time_minutes + slot_duration_minutes
+            else:
+                next_completion_time = progress_kernel.next_completion_time(workers)
+                if next_completion_time is None:
+                    next_time_minutes = self.max_simulation_time
+                else:
+                    next_time_minutes = min(next_completion_time, self.max_simulation_time)
+            if stop_minutes is not None:
+                next_time_minutes = min(next_time_minutes, stop_minutes)
+            
+            # Fill the skipped slots with the unchanged worker state
+            skipped_slots = max(1, math.ceil((next_time_minutes - current_time_minutes) / slot_duration_minutes))
+            skipped_time_minutes = current_time_minutes + skipped_slots * slot_duration_minutes
+            simulation_profile.count("ticks", skipped_slots - 1)
+            simulation_profile.count("idle_ticks", skipped_slots - 1)
+            if self.record_schedule:
+                phase_started = simulation_profile.start()
+                self.schedule.record(current_time_minutes + slot_duration_minutes, skipped_time_minutes,
+                                     progress_kernel.task_index)
+                simulation_profile.stop("schedule_recording", phase_started)
+            
+            self.current_time_minutes = max(skipped_time_minutes, next_time_minutes)
+    
+    def change_workers(self, available_workers_df):
+        """Make available_workers_df the worker set from the current time on.
+        
+        Workers missing from it leave: a task they finish at this very time is completed first,
+        any other task they were on is given up (status "interrupted") and its unit queued again.
+        Workers that left earlier and are listed again return, and new workers join. Returns
+        whether anything changed.
+        """
+        current_time_minutes = self.current_time_minutes
+        worker_names = set(available_workers_df["Worker"])
+        leaving = [worker for worker in self.workers
+                   if worker.name not in worker_names and worker.left_at_minutes is None]
+        returning = [worker for worker in self.workers
+                     if worker.name in worker_names and worker.left_at_minutes is not None]
+        
+        due = [worker.worker_index for worker in leaving
+               if self.progress_kernel.completion_time[worker.worker_index] <= current_time_minutes]
+        self._complete(np.array(due, dtype=np.int64))
+        for worker in leaving:
+            if worker.current_task_instance is not None:
+                interrupt_worker_task(worker, current_time_minutes, self.slot_duration_minutes, self.ready_tracker,
+                                      self.simulation_log)
+            worker.mark_left(current_time_minutes)
+            self.progress_kernel.set_absent(worker.worker_index, True)
+        for worker in returning:
+            worker.mark_returned(current_time_minutes)
+            self.progress_kernel.set_absent(worker.worker_index, False)
+        
+        joining = [WorkerSimulationData(row, self.rng) for _, row in available_workers_df.iterrows()
+                   if row["Worker"] not in self.worker_sim_data_map]
+        if joining:
+            for worker in joining:
+                worker.worker_index = len(self.workers)
+                worker.joined_at_minutes = current_time_minutes
+                self.worker_sim_data_map[worker.name] = worker
+                self.workers.append(worker)
+            joining_names = [worker.name for worker in joining]
+            self.progress_kernel.add_workers(len(joining))
+            self.simulation_log.add_workers(joining_names)
+            if self.record_schedule:
+                self.schedule.add_workers(joining_names)
+            # The matrix is shared with the checkpoint this state was copied from, so append to a copy
+            self.skill_matrix = copy.copy(self.skill_matrix)
+            self.skill_matrix.add_workers(joining, self.catalog)
+        return bool(leaving or returning or joining)
+    
+    def change_order(self, products_delta):
+        """Add units of products, or cancel units not started yet (negative counts); returns whether
+        anything changed"""
+        changed = bool(self.ready_tracker.add_units(products_delta))
+        self.finished = self.completed_count >= self.ready_tracker.total_units
+        return changed
+    
+    def extend_horizon(self):
+        """Push the horizon out if the remaining work does not fit before it with the current workers"""
+        present_workers = sum(1 for worker in self.workers if worker.left_at_minutes is None)
+        if not present_workers:
+            return
+        busy = self.progress_kernel.task_index >= 0
+        running_slots = float((self.progress_kernel.completion_time[busy] - self.current_time_minutes).sum()
+                              / self.slot_duration_minutes)
+        remaining_slots = self.ready_tracker.pending_slots() + running_slots
+        worker_slots_per_day = present_workers * (8 * 60 / self.slot_duration_minutes)
+        needed_days = math.ceil(self.current_time_minutes / (8 * 60) + remaining_slots / worker_slots_per_day)
+        if needed_days > self.estimated_days:
+            self.estimated_days = needed_days
+            self.max_simulation_time = needed_days * 8 * 60
+            if self.record_schedule:
+                self.schedule.extend_days(needed_days)
+    
+    def result(self, profile=None, run_started=None):
+        """Result dict of the run so far (see assign_tasks); call once, after the last run()"""
+        if self.clock_mode == "event":
+            # Bring tasks that are still running to the state the tick clock leaves them in
+            last_tick_minutes = ((self.max_simulation_time - 1) // self.slot_duration_minutes) * self.slot_duration_minutes
+            self.progress_kernel.settle(last_tick_minutes, self.slot_duration_minutes, self.workers)
+        self.progress_kernel.sync(self.workers)
+        
+        worker_sim_data_map = self.worker_sim_data_map
+        skill_matrix = self.skill_matrix
+        task_instances = self.ready_tracker.started_instances
+        completed_instances = [ti for ti in task_instances if ti.status == "completed"]
+        
+        result = {
+            "schedule": self.schedule,
+            "inventory": dict(self.inventory),
+            "simulation_log": self.simulation_log,
+            "estimated_days": self.estimated_days,
+            "slot_duration_minutes": self.slot_duration_minutes,
+            "task_instances": task_instances,
+            "total_units": self.ready_tracker.total_units,
+            "worker_sim_data_map": worker_sim_data_map,
+            "skill_match_matrix": skill_matrix,
+            "assignment_strategy": self.assignment_strategy,
+            "all_tasks_completed": len(completed_instances) == self.ready_tracker.total_units,
+            "makespan_minutes": max((ti.completion_time_minutes for ti in completed_instances), default=0),
+            "total_skill_utilization": float(sum(
+                skill_matrix.skill_match[worker_sim_data_map[ti.assigned_worker_name].worker_index, ti.task_index]
+                for ti in completed_instances
+            ))
+        }
+        result["profile"] = (profile.summary(time.perf_counter() - run_started)
+                             if profile is not None and profile.enabled else None)
+        return result
+
+class SimulationCheckpoint:
+    """Snapshot of a simulation at the start of a slot: inventory, unit statuses, worker assignments
+    and clock, before anything at that time is processed.
+    
+    assign_tasks(checkpoint_minutes=...) returns one as result["checkpoint"]. resume_simulation()
+    continues from it, as often as needed, each time on a fresh copy; units finished before the
+    checkpoint are shared with the original run instead of copied.
+    """
+    def __init__(self, state, time_minutes=None):
+        self.state = state.copy()
+        # A run that finished early idles until the requested time
+        if self.state.finished and time_minutes is not None and time_minutes > self.state.current_time_minutes:
+            self.state.current_time_minutes = time_minutes
+    
+    @property
+    def time_minutes(self):
+        return self.state.current_time_minutes
+    
+    def __repr__(self):
+        return f"SimulationCheckpoint(Time={format_time(self.time_minutes)}, Units={self.state.ready_tracker.total_units})"
+
+def _run_to_result(state, simulation_profile, run_started, checkpoint_minutes=None):
+    """Run a state to the end, taking a SimulationCheckpoint at checkpoint_minutes on the way"""
+    checkpoint = None
+    if checkpoint_minutes is not None:
+        slot_duration_minutes = state.slot_duration_minutes
+        stop_minutes = math.ceil(checkpoint_minutes / slot_duration_minutes) * slot_duration_minutes
+        state.run(simulation_profile, stop_minutes=stop_minutes)
+        checkpoint = SimulationCheckpoint(state, stop_minutes)
+    state.run(simulation_profile)
+    result = state.result(simulation_profile, run_started)
+    result["checkpoint"] = checkpoint
+    return result
+
+def assign_tasks(products_to_produce, available_workers_df, products_df, slot_duration_minutes=30, clock_mode="event",
+                 catalog=None, assignment_strategy="greedy", record_schedule=True, log_verbosity="full",
+                 log_max_events=None, seed=0, profile=False, checkpoint_minutes=None):
+    """Enhanced task assignment with dynamic worker transitions and interchangeable requirements
+    
+    clock_mode="tick" advances the simulation one slot at a time. clock_mode="event" jumps
+    straight to the next slot where the assignment can change, filling the skipped slots of the
+    schedule grid from the unchanged worker state. Both modes produce the same schedule. Worker
+    progress is tracked by a WorkerProgressKernel in either mode.
+    
+    catalog is the CompiledCatalog of products_df; it is compiled on the spot when not given.
+    
+    assignment_strategy="greedy" hands out tasks in list order with the skill based fallback;
+    assignment_strategy="optimal" keeps the same level quotas but solves every decision point as
+    an assignment problem maximizing the total skill x favorite score (see run_optimal_matching).
+    
+    The schedule is returned as a ScheduleGrid; record_schedule=False skips it (schedule is None),
+    for callers that only need the task instances and summary figures.
+    
+    log_verbosity ("off", "summary" or "full") and log_max_events configure the SimulationLog
+    returned as simulation_log.
+    
+    seed seeds the random draws of the run, so identical arguments give identical results (see
+    simulation_cache_key).
+    
+    profile=True times each phase of the loop and counts ticks and assignments; the summary is
+    returned as result["profile"] (None when profiling is off).
+    
+    checkpoint_minutes snapshots the run when its clock reaches that time (rounded up to a slot)
+    and returns the SimulationCheckpoint as result["checkpoint"] (otherwise None), for
+    resume_simulation() to re-plan from with other workers or order quantities.
+    """
+    if clock_mode not in ("tick", "event"):
+        raise ValueError(f"Unknown clock mode: {clock_mode}")
+    if assignment_strategy not in ASSIGNMENT_STRATEGIES:
+        raise ValueError(f"Unknown assignment strategy: {assignment_strategy}")
+    
+    run_started = time.perf_counter()
+    simulation_profile = SimulationProfile(enabled=profile)
+    phase_started = simulation_profile.start()
+    
+    # Initialize simulation data structures
+    if catalog is None:
+        catalog = CompiledCatalog(products_df)
+    state = SimulationState(products_to_produce, available_workers_df, catalog, slot_duration_minutes, clock_mode,
+                            assignment_strategy, record_schedule, log_verbosity, log_max_events, seed)
+    simulation_profile.stop("setup", phase_started)
+    
+    return _run_to_result(state, simulation_profile, run_started, checkpoint_minutes)
+
+def resume_simulation(checkpoint, available_workers_df=None, order_delta=None, profile=False,
+                      checkpoint_minutes=None):
+    """Re-plan from a SimulationCheckpoint with a changed worker set and/or order.
+    
+    available_workers_df is the worker set from the checkpoint on (None keeps it; see
+    SimulationState.change_workers for leaving, returning and new workers). order_delta
+    {product: units} adds units to the order, or cancels units not started yet when negative.
+    After a change the horizon is extended if the remaining work no longer fits before it.
+    
+    Only the time from the checkpoint on is simulated, so re-planning takes time proportional to
+    the remaining work; the result covers the whole run, like the one of assign_tasks, and can
+    carry a new checkpoint (checkpoint_minutes) for the next change.
+    """
+    run_started = time.perf_counter()
+    simulation_profile = SimulationProfile(enabled=profile)
+    phase_started = simulation_profile.start()
+    
+    if order_delta:
+        unknown_products = [product for product in order_delta
+                            if product not in checkpoint.state.catalog.product_index]
+        if unknown_products:
+            raise ValueError(f"Unknown products: {', '.join(unknown_products)}")
+        order_delta = {product: _whole_number(units, f"Quantity of {product}") for product, units in order_delta.items()}
+    state = checkpoint.state.copy()
+    
+    changed = False
+    if available_workers_df is not None:
+        changed = state.change_workers(available_workers_df) or changed
+    if order_delta:
+        changed = state.change_order(order_delta) or changed
+    if changed:
+        state.extend_horizon()
+    simulation_profile.stop("setup", phase_started)
+    
+    return _run_to_result(state, simulation_profile, run_started, checkpoint_minutes)
+
+
+def compute_worker_stats(result):
+    """Per-worker totals of a simulation result: completed units, working time and skill match.
+    
+    Aggregated in one grouped pass over the completed instances and returned as a DataFrame with
+    Worker, Tasks Completed, Working Time (min), Avg Skill Match and Status (Available, Busy, or
+    Absent for a worker who left a resumed simulation) columns.
+    """
+    worker_sim_data_map = result["worker_sim_data_map"]
+    completed_instances = [ti for ti in result["task_instances"] if ti.status == "completed"]
+    worker_idx = np.array([worker_sim_data_map[ti.assigned_worker_name].worker_index for ti in completed_instances],
+                          dtype=np.int64)
+    task_idx = np.array([ti.task_index for ti in completed_instances], dtype=np.int64)
+    durations = np.array([ti.duration_slot for ti in completed_instances], dtype=float)
+    
+    num_workers = len(worker_sim_data_map)
+    tasks_completed = np.bincount(worker_idx, minlength=num_workers)
+    working_time = np.bincount(worker_idx, weights=durations * result["slot_duration_minutes"], minlength=num_workers)
+    skill_total = np.bincount(worker_idx, weights=result["skill_match_matrix"].skill_match[worker_idx, task_idx],
+                              minlength=num_workers)
+    avg_skill_match = np.divide(skill_total, tasks_completed, out=np.zeros(num_workers), where=tasks_completed > 0)
+    
+    return pd.DataFrame({
+        "Worker": list(worker_sim_data_map),
+        "Tasks Completed": tasks_completed,
+        "Working Time (min)": working_time,
+        "Avg Skill Match": avg_skill_match,
+        "Status": ["Absent" if worker_data.left_at_minutes is not None else "Available" if worker_data.is_available
+                   else "Busy" for worker_data in worker_sim_data_map.values()]
+    })
+
+def compute_idle_ratio(result):
+    """Share of worker time spent idle between the start of the run and its end.
+    
+    The end is the makespan when every task finished, otherwise the simulation horizon. Workers
+    who joined, left or returned in a resumed simulation count only for the time they were present.
+    """
+    if result["all_tasks_completed"]:
+        horizon_minutes = result["makespan_minutes"]
+    else:
+        horizon_minutes = result["estimated_days"] * 8 * 60
+    available_minutes = sum(worker.present_minutes(horizon_minutes)
+                            for worker in result["worker_sim_data_map"].values())
+    if available_minutes <= 0:
+        return 0.0
+    
+    busy_minutes = 0
+    for ti in result["task_instances"]:
+        end_minutes = ti.completion_time_minutes if ti.completion_time_minutes is not None else horizon_minutes
+        busy_minutes += min(end_minutes, horizon_minutes) - ti.start_time_minutes
+    return max(0.0, 1.0 - busy_minutes / available_minutes)
+
+# --- Result Cache ---
+RESULT_CACHE_VERSION = 2  # Bump when the layout of the result dict changes
+
+def simulation_cache_key(products_to_produce, available_workers_df, products_df, slot_duration_minutes=30,
+                         catalog=None, seed=0, **options):
+    """Cache key of an assign_tasks call, taking the same arguments.
+    
+    Covers the order, the selected workers and a hash of their rows, the catalog content hash,
+    the slot duration, the RNG seed and the remaining assign_tasks options.
+    """
+    key = {
+        "version": RESULT_CACHE_VERSION,
+        "order": sorted((str(product), int(quantity)) for product, quantity in products_to_produce.items()),
+        "workers": [str(worker_name) for worker_name in available_workers_df["Worker"]],
+        "workers_hash": catalog_content_hash(available_workers_df),
+        "catalog_hash": catalog.content_hash if catalog is not None else catalog_content_hash(products_df),
+        "slot_duration_minutes": slot_duration_minutes,
+        "seed": seed,
+        "options": sorted((name, repr(value)) for name, value in options.items()),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+class SimulationResultCache:
+    """Bounded LRU of simulation results keyed by simulation_cache_key.
+    
+    With cache_dir set, every result is also pickled to <cache_dir>/<key>.pkl, so results evicted
+    from memory or computed before a restart are still served. The directory keeps at most
+    max_disk_entries files and max_disk_bytes bytes (None for no limit); the least recently used
+    files are deleted first. Cached results are shared between callers and must be treated as
+    read-only.
+    """
+    def __init__(self, max_entries=16, cache_dir=None, max_disk_entries=256, max_disk_bytes=2 ** 30):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+    
+    def _remember(self, key, result):
+        with self._lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def get(self, key):
+        """Cached result for key, or None"""
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+        
+        if self.cache_dir and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), "rb") as f:
+                    result = pickle.load(f)
+            except Exception:
+                # Unreadable or outdated file: treat as a miss, it is overwritten by put()
+                result = None
+            if result is not None:
+                try:
+                    # The modification time orders the files for eviction
+                    os.utime(self._path(key))
+                except OSError:
+                    pass
+                self._remember(key, result)
+                self.hits += 1
+                return result
+        
+        self.misses += 1
+        return None
+    
+    def put(self, key, result):
+        self._remember(key, result)
+        if self.cache_dir:
+            temp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+            self._evict_files()
+    
+    def _evict_files(self):
+        """Delete the least recently used files until the directory is within its limits"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pkl"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        files.sort()
+        num_files = len(files)
+        total_bytes = sum(size for _, size, _ in files)
+        for _, size, path in files[:-1]:
+            # The newest file is always kept, even alone over max_disk_bytes
+            if ((self.max_disk_entries is None or num_files <= self.max_disk_entries)
+                    and (self.max_disk_bytes is None or total_bytes <= self.max_disk_bytes)):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            num_files -= 1
+            total_bytes -= size
+    
+    def get_or_run(self, key, run_simulation):
+        """Cached result for key, computed with run_simulation() and stored on a miss"""
+        result = self.get(key)
+        if result is None:
+            result = run_simulation()
+            self.put(key, result)
+        return result
+    
+    def __len__(self):
+        return len(self.entries)
+
+# --- Headless Batch Interface ---
+def load_catalog_files(workers_path="workers.csv", products_path="products.csv"):
+    """Read the worker and product CSV files without any UI side effects"""
+    return pd.read_csv(workers_path), pd.read_csv(products_path)
+
+def summarize_result(result):
+    """JSON-serializable summary of a simulation result: assignments, makespan and worker stats"""
+    assignments = [
+        {
+            "instance_id": ti.instance_id,
+            "task_id": ti.task_id,
+            "product": ti.product,
+            "worker": ti.assigned_worker_name,
+            "status": ti.status,
+            "start_minutes": int(ti.start_time_minutes),
+            "completion_minutes": None if ti.completion_time_minutes is None else int(ti.completion_time_minutes)
+        }
+        for ti in result["task_instances"]
+    ]
+    assignments.sort(key=lambda assignment: (assignment["start_minutes"], assignment["worker"]))
+    
+    return {
+        "estimated_days": result["estimated_days"],
+        "makespan_minutes": int(result["makespan_minutes"]),
+        "all_tasks_completed": result["all_tasks_completed"],
+        "units_pending": result["total_units"] - sum(1 for ti in result["task_instances"] if ti.status != "interrupted"),
+        "total_skill_utilization": round(result["total_skill_utilization"], 6),
+        "idle_ratio": round(compute_idle_ratio(result), 6),
+        "schedule": assignments,
+        "worker_stats": [
+            {
+                "worker": stats["Worker"],
+                "tasks_completed": int(stats["Tasks Completed"]),
+                "working_minutes": float(stats["Working Time (min)"]),
+                "avg_skill_match": round(float(stats["Avg Skill Match"]), 6)
+            }
+            for stats in compute_worker_stats(result).to_dict("records")
+        ]
+    }
+
+def _whole_number(value, name):
+    """value as an int, or a ValueError naming it when it is not a whole number"""
+    if isinstance(value, bool) or not isinstance(value, numbers.Real) or not float(value).is_integer():
+        raise ValueError(f"{name} must be a whole number, got {value!r}")
+    return int(value)
+
+def _resolve_order_request(order_request, workers_df, catalog):
+    """Validated (products_to_produce, available_workers_df, slot_duration_minutes) of an order request"""
+    if order_request.get("slot_duration_minutes") is None:
+        raise ValueError("slot_duration_minutes is required")
+    slot_duration_minutes = _whole_number(order_request["slot_duration_minutes"], "slot_duration_minutes")
+    if slot_duration_minutes <= 0:
+        raise ValueError(f"slot_duration_minutes must be positive, got {slot_duration_minutes}")
+    products_to_produce = {}
+    for product, quantity in order_request["products_to_produce"].items():
+        quantity = _whole_number(quantity, f"Quantity of {product}")
+        if quantity < 0:
+            raise ValueError(f"Quantity of {product} must not be negative, got {quantity}")
+        if quantity > 0:
+            products_to_produce[product] = quantity
+    unknown_products = [product for product in products_to_produce if product not in catalog.product_index]
+    if unknown_products:
+        raise ValueError(f"Unknown products: {', '.join(unknown_products)}")
+    
+    worker_names = order_request.get("workers")
+    if worker_names is None:
+        available_workers_df = workers_df
+    else:
+        unknown_workers = sorted(set(worker_names) - set(workers_df["Worker"]))
+        if unknown_workers:
+            raise ValueError(f"Unknown workers: {', '.join(unknown_workers)}")
+        available_workers_df = workers_df[workers_df["Worker"].isin(worker_names)]
+    if available_workers_df.empty:
+        raise ValueError("Select at least one worker!")
+    return products_to_produce, available_workers_df, slot_duration_minutes
+
+def run_order_request(order_request, workers_df, products_df, catalog):
+    """Simulate one order request (a dict read from a JSONL line) and return its summary"""
+    products_to_produce, available_workers_df, slot_duration_minutes = _resolve_order_request(
+        order_request, workers_df, catalog)
+    result = assign_tasks(
+        products_to_produce=products_to_produce,
+        available_workers_df=available_workers_df,
+        products_df=products_df,
+        slot_duration_minutes=slot_duration_minutes,
+        catalog=catalog,
+        assignment_strategy=order_request.get("assignment_strategy", "greedy"),
+        record_schedule=False,
+        log_verbosity="off"
+    )
+    return summarize_result(result)
+
+def run_batch(input_stream, output_stream, workers_df, products_df):
+    """Stream order requests from JSONL input and write one JSONL result per request.
+    
+    A request that fails (bad JSON, unknown product or worker, ...) produces an {"ok": false}
+    line with the error instead of stopping the batch. Returns the number of failed requests.
+    """
+    catalog = CompiledCatalog(products_df)
+    failures = 0
+    for line_number, line in enumerate(input_stream, start=1):
+        if not line.strip():
+            continue
+        response = {"line": line_number}
+        try:
+            order_request = json.loads(line)
+            response["request_id"] = order_request.get("request_id")
+            response.update(run_order_request(order_request, workers_df, products_df, catalog))
+            response["ok"] = True
+        except Exception as e:
+            failures += 1
+            response["ok"] = False
+            response["error"] = str(e)
+        output_stream.write(json.dumps(response) + "\n")
+        output_stream.flush()
+    return failures
+
+# --- Online Dispatch ---
+class Dispatcher:
+    """Online counterpart of assign_tasks: hands out the next task as events come in from the floor.
+    
+    Instead of simulating the whole horizon, the dispatcher is told what happens: start() at the
+    beginning of the order, complete() when a worker finishes a unit, join() and leave() when
+    staffing changes and change_order() when the order does. Each event runs the assignment
+    rules of one decision point of the simulation (run_assignment_pass: earliest task priority,
+    level balancing, skill/favorite fallback) over the idle workers and returns the new
+    assignments as dicts.
+    
+    Nothing is rebuilt per event: the ReadyTaskTracker only releases the task types a completion
+    unblocks, idle workers are kept as a set and a joining worker adds one row to the
+    SkillMatchMatrix, so an event costs one decision point with the idle workers.
+    
+    Times are minutes since the start of the order, as in the simulation. An event without a
+    time happens at the time of the previous event, and an earlier time counts as that time.
+    """
+    def __init__(self, products_to_produce, available_workers_df, catalog, slot_duration_minutes=30,
+                 assignment_strategy="greedy", log_verbosity="full", log_max_events=None, seed=0):
+        if assignment_strategy not in ASSIGNMENT_STRATEGIES:
+            raise ValueError(f"Unknown assignment strategy: {assignment_strategy}")
+        self.catalog = catalog
+        self.slot_duration_minutes = slot_duration_minutes
+        self.assignment_strategy = assignment_strategy
+        self.rng = np.random.default_rng(seed)
+        self.worker_sim_data_map = {row["Worker"]: WorkerSimulationData(row, self.rng)
+                                    for _, row in available_workers_df.iterrows()}
+        for worker_idx, worker in enumerate(self.worker_sim_data_map.values()):
+            worker.worker_index = worker_idx
+        self.workers = list(self.worker_sim_data_map.values())
+        self.skill_matrix = SkillMatchMatrix(self.workers, catalog)
+        self.ready_tracker = ReadyTaskTracker(catalog, products_to_produce)
+        self.inventory = defaultdict(int)
+        self.completed_count = 0
+        self.current_time_minutes = 0
+        self.idle_workers = set(range(len(self.workers)))
+        self.simulation_log = SimulationLog(self.worker_sim_data_map, catalog.task_ids, assignment_strategy,
+                                            log_verbosity, log_max_events)
+    
+    @property
+    def finished(self):
+        """Whether every unit of the order is completed"""
+        return self.completed_count >= self.ready_tracker.total_units
+    
+    def _event_time(self, time_minutes):
+        """Clock after an event at time_minutes (None keeps the current time); checked before an
+        event touches anything, so a bad time leaves the dispatcher unchanged"""
+        if time_minutes is None:
+            return self.current_time_minutes
+        if isinstance(time_minutes, bool) or not isinstance(time_minutes, numbers.Real) or np.isnan(time_minutes):
+            raise ValueError(f"time_minutes must be a number, got {time_minutes!r}")
+        return max(self.current_time_minutes, time_minutes)
+    
+    def _present_worker(self, worker_name):
+        worker = self.worker_sim_data_map.get(worker_name)
+        if worker is None:
+            raise ValueError(f"Unknown workers: {worker_name}")
+        if worker.left_at_minutes is not None:
+            raise ValueError(f"Worker {worker_name} is not present")
+        return worker
+    
+    def _dispatch(self):
+        """Run the assignment rules over the idle workers and return the new assignments"""
+        available_workers = [self.workers[worker_idx] for worker_idx in sorted(self.idle_workers)]
+        newly_assigned = run_assignment_pass(self.worker_sim_data_map, self.ready_tracker, self.skill_matrix,
+                                             self.current_time_minutes, self.slot_duration_minutes,
+                                             self.simulation_log, self.assignment_strategy, available_workers)
+        self.idle_workers.difference_update(worker.worker_index for worker in newly_assigned)
+        return [
+            {
+                "worker": worker.name,
+                "instance_id": worker.current_task_instance.instance_id,
+                "task_id": worker.current_task_instance.task_id,
+                "product": worker.current_task_instance.product,
+                "task": worker.current_task_instance.description,
+                "start_minutes": worker.current_task_instance.start_time_minutes,
+                "expected_completion_minutes": worker.expected_completion_time
+            }
+            for worker in newly_assigned
+        ]
+    
+    def start(self, time_minutes=None):
+        """Assign the workers present at the start of the order"""
+        self.current_time_minutes = self._event_time(time_minutes)
+        return self._dispatch()
+    
+    def complete(self, worker_name, instance_id=None, time_minutes=None):
+        """A worker finished their unit; instance_id, when given, must be the unit they were assigned"""
+        event_time = self._event_time(time_minutes)
+        worker = self._present_worker(worker_name)
+        task_instance = worker.current_task_instance
+        if task_instance is None:
+            raise ValueError(f"Worker {worker_name} has no task to complete")
+        if instance_id is not None and instance_id != task_instance.instance_id:
+            raise ValueError(f"Worker {worker_name} is working on {task_instance.instance_id}, not {instance_id}")
+        self.current_time_minutes = event_time
+        complete_worker_task(worker, self.current_time_minutes, self.inventory, self.ready_tracker,
+                             self.simulation_log)
+        self.completed_count += 1
+        self.idle_workers.add(worker.worker_index)
+        return self._dispatch()
+    
+    def join(self, worker_row, time_minutes=None):
+        """A worker arrives: a new worker (a row with the workers.csv columns) or one who left earlier,
+        for whom the Worker column is enough"""
+        event_time = self._event_time(time_minutes)
+        worker_name = str(worker_row["Worker"])
+        worker = self.worker_sim_data_map.get(worker_name)
+        if worker is None:
+            # Everything that can fail happens before the dispatcher is touched
+            invalid_skills = [skill for skill in SKILL_COLUMNS
+                              if not isinstance(worker_row[skill], numbers.Real) or np.isnan(worker_row[skill])]
+            if invalid_skills:
+                raise ValueError(f"Worker {worker_name} needs numeric skills: {', '.join(invalid_skills)}")
+            worker = WorkerSimulationData(worker_row, self.rng)
+            self.skill_matrix.add_workers([worker], self.catalog)
+            worker.worker_index = len(self.workers)
+            self.worker_sim_data_map[worker.name] = worker
+            self.workers.append(worker)
+            self.simulation_log.add_workers([worker.name])
+        elif worker.left_at_minutes is None:
+            raise ValueError(f"Worker {worker_name} is already present")
+        self.current_time_minutes = event_time
+        if worker.left_at_minutes is None:
+            worker.is_available = True
+            worker.joined_at_minutes = self.current_time_minutes
+        else:
+            worker.mark_returned(self.current_time_minutes)
+        self.idle_workers.add(worker.worker_index)
+        return self._dispatch()
+    
+    def leave(self, worker_name, time_minutes=None):
+        """A worker leaves; the unit they were on goes back to the queue (see interrupt_worker_task)"""
+        event_time = self._event_time(time_minutes)
+        worker = self._present_worker(worker_name)
+        self.current_time_minutes = event_time
+        if worker.current_task_instance is not None:
+            interrupt_worker_task(worker, self.current_time_minutes, self.slot_duration_minutes, self.ready_tracker,
+                                  self.simulation_log)
+        worker.mark_left(self.current_time_minutes)
+        self.idle_workers.discard(worker.worker_index)
+        return self._dispatch()
+    
+    def change_order(self, products_delta, time_minutes=None):
+        """Add units of products, or cancel units not started yet (negative counts)"""
+        event_time = self._event_time(time_minutes)
+        unknown_products = [product for product in products_delta if product not in self.catalog.product_index]
+        if unknown_products:
+            raise ValueError(f"Unknown products: {', '.join(unknown_products)}")
+        self.current_time_minutes = event_time
+        self.ready_tracker.add_units(products_delta)
+        return self._dispatch()
+    
+    def status(self):
+        """Who works on what, who waits for work and how far the order is"""
+        return {
+            "time_minutes": self.current_time_minutes,
+            "total_units": self.ready_tracker.total_units,
+            "completed_units": self.completed_count,
+            "finished": self.finished,
+            "busy": {worker.name: worker.current_task_instance.instance_id for worker in self.workers
+                     if worker.current_task_instance is not None},
+            "idle": [self.workers[worker_idx].name for worker_idx in sorted(self.idle_workers)],
+            "absent": [worker.name for worker in self.workers if worker.left_at_minutes is not None]
+        }
+    
+    def __repr__(self):
+        return (f"Dispatcher(Time={format_time(self.current_time_minutes)}, "
+                f"Completed={self.completed_count}/{self.ready_tracker.total_units})")
+
+DISPATCH_EVENTS = ("start", "complete", "join", "leave", "order", "status")
+
+def _join_worker_row(event, workers_df, dispatcher):
+    """Worker row of a join event: known to the dispatcher, from the workers file, or the event itself"""
+    worker_name = event["worker"]
+    if worker_name in dispatcher.worker_sim_data_map:
+        return {"Worker": worker_name}
+    matches = workers_df[workers_df["Worker"] == worker_name]
+    if len(matches):
+        return matches.iloc[0]
+    if any(skill not in event for skill in SKILL_COLUMNS):
+        raise ValueError(f"Unknown workers: {worker_name}")
+    return {"FavoriteProduct1": None, "FavoriteProduct2": None, "FavoriteProduct3": None, **event,
+            "Worker": worker_name}
+
+def run_dispatch(input_stream, output_stream, workers_df, products_df):
+    """Drive a Dispatcher from JSONL events and write one JSONL response per event.
+    
+    A "start" event opens an order and takes the fields of an order request (see run_batch).
+    "complete" (worker, instance_id), "join" (worker, plus the skill columns for a worker not in
+    the workers file), "leave" (worker), "order" (products_delta) and "status" events follow, each
+    with an optional time_minutes. Responses list the new assignments, or the status. A failing
+    event produces an {"ok": false} line with the error and leaves the dispatcher unchanged.
+    Returns the number of failed events.
+    """
+    catalog = CompiledCatalog(products_df)
+    dispatcher = None
+    failures = 0
+    for line_number, line in enumerate(input_stream, start=1):
+        if not line.strip():
+            continue
+        response = {"line": line_number}
+        try:
+            event = json.loads(line)
+            kind = event.get("event")
+            time_minutes = event.get("time_minutes")
+            response["event"] = kind
+            if kind not in DISPATCH_EVENTS:
+                raise ValueError(f"Unknown event: {kind}")
+            if kind == "start":
+                products_to_produce, available_workers_df, slot_duration_minutes = _resolve_order_request(
+                    event, workers_df, catalog)
+                dispatcher = Dispatcher(products_to_produce, available_workers_df, catalog,
+                                        slot_duration_minutes=slot_duration_minutes,
+                                        assignment_strategy=event.get("assignment_strategy", "greedy"),
+                                        log_verbosity="off")
+                response["assignments"] = dispatcher.start(time_minutes)
+            elif dispatcher is None:
+                raise ValueError("No order started yet, send a start event first")
+            elif kind == "complete":
+                response["assignments"] = dispatcher.complete(event["worker"], event.get("instance_id"), time_minutes)
+            elif kind == "join":
+                response["assignments"] = dispatcher.join(_join_worker_row(event, workers_df, dispatcher), time_minutes)
+            elif kind == "leave":
+                response["assignments"] = dispatcher.leave(event["worker"], time_minutes)
+            elif kind == "order":
+                products_delta = {product: _whole_number(quantity, f"Quantity of {product}")
+                                  for product, quantity in event["products_delta"].items()}
+                response["assignments"] = dispatcher.change_order(products_delta, time_minutes)
+            else:
+                response.update(dispatcher.status())
+            response["finished"] = dispatcher.finished
+            response["ok"] = True
+        except Exception as e:
+            failures += 1
+            response["ok"] = False
+            response["error"] = str(e)
+        output_stream.write(json.dumps(response) + "\n")
+        output_stream.flush()
+    return failures
+
+# --- Scenario Sweep ---
+_sweep_context = {}
+
+def build_scenario_grid(products_to_produce, worker_subsets, quantity_scales=(1.0,), slot_durations=(30,)):
+    """Every combination of worker subset, quantity scale and slot duration for one order.
+    
+    worker_subsets maps a label to a list of worker names; quantities are scaled and rounded,
+    keeping at least one unit of every ordered product.
+    """
+    scenarios = []
+    for subset_label, worker_names in worker_subsets.items():
+        for quantity_scale in quantity_scales:
+            for slot_duration_minutes in slot_durations:
+                scenarios.append({
+                    "scenario_id": len(scenarios) + 1,
+                    "worker_subset": subset_label,
+                    "workers": list(worker_names),
+                    "quantity_scale": quantity_scale,
+                    "products_to_produce": {product: max(1, round(quantity * quantity_scale))
+                                            for product, quantity in products_to_produce.items()},
+                    "slot_duration_minutes": int(slot_duration_minutes)
+                })
+    return scenarios
+
+def _init_sweep_process(workers_df, products_df, catalog):
+    """Receive the read-only catalog once per pool process instead of once per scenario"""
+    _sweep_context["workers_df"] = workers_df
+    _sweep_context["products_df"] = products_df
+    _sweep_context["catalog"] = catalog
+
+def _run_sweep_scenario(scenario):
+    started = time.perf_counter()
+    workers_df = _sweep_context["workers_df"]
+    result = assign_tasks(
+        products_to_produce=scenario["products_to_produce"],
+        available_workers_df=workers_df[workers_df["Worker"].isin(scenario["workers"])],
+        products_df=_sweep_context["products_df"],
+        slot_duration_minutes=scenario["slot_duration_minutes"],
+        catalog=_sweep_context["catalog"],
+        assignment_strategy=scenario.get("assignment_strategy", "greedy"),
+        record_schedule=False,
+        log_verbosity="off"
+    )
+    completed = sum(1 for ti in result["task_instances"] if ti.status == "completed")
+    return {
+        "Scenario": scenario["scenario_id"],
+        "Workers": scenario["worker_subset"],
+        "Worker Count": len(result["worker_sim_data_map"]),
+        "Quantity Scale": scenario["quantity_scale"],
+        "Slot (min)": scenario["slot_duration_minutes"],
+        "Makespan (min)": int(result["makespan_minutes"]),
+        "Finished": result["all_tasks_completed"],
+        "Idle Ratio": round(compute_idle_ratio(result), 4),
+        "Avg Skill Match": round(result["total_skill_utilization"] / completed, 4) if completed else 0.0,
+        "Runtime (s)": round(time.perf_counter() - started, 3)
+    }
+
+def run_scenario_sweep(scenarios, workers_df, products_df, catalog=None, max_processes=None):
+    """Simulate scenarios on a process pool and yield one comparison row per scenario as it finishes.
+    
+    The workers/products frames and the compiled catalog are handed to each pool process once,
+    through the pool initializer, and only the small scenario dicts travel per task. Processes are
+    spawned rather than forked so the pool is safe to start from the threaded Streamlit server.
+    """
+    if catalog is None:
+        catalog = CompiledCatalog(products_df)
+    if not scenarios:
+        return
+    max_processes = max(1, min(max_processes or os.cpu_count() or 1, len(scenarios)))
+    
+    with ProcessPoolExecutor(
+        max_workers=max_processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_sweep_process,
+        initargs=(workers_df, products_df, catalog)
+    ) as executor:
+        futures = {executor.submit(_run_sweep_scenario, scenario): scenario for scenario in scenarios}
+        for future in as_completed(futures):
+            yield future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run production order simulations headless. Each input line is a JSON object like "
+                    '{"request_id": "A1", "products_to_produce": {"Standing Acrylic T": 10}, '
+                    '"workers": ["Worker Andy"], "slot_duration_minutes": 30}; '
+                    '"workers" defaults to every worker in the workers file.'
+    )
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file with order requests (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for the results (default: stdout)")
+    parser.add_argument("--workers", default="workers.csv", help="Workers CSV file")
+    parser.add_argument("--products", default="products.csv", help="Products CSV file")
+    parser.add_argument("--dispatch", action="store_true",
+                        help="Read dispatch events instead of order requests and answer each with the next "
+                             'assignments, e.g. {"event": "complete", "worker": "Worker Andy", '
+                             '"instance_id": "ST1_U1", "time_minutes": 60} (see run_dispatch)')
+    args = parser.parse_args(argv)
+    
+    workers_df, products_df = load_catalog_files(args.workers, args.products)
+    input_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        run = run_dispatch if args.dispatch else run_batch
+        failures = run(input_stream, output_stream, workers_df, products_df)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,578 @@
+"""Unit tests for the scheduling engine and the catalog stores.
+
+Run with `python test.py` (or `python -m pytest test.py`).
+"""
+import heapq
+import io
+import itertools
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+
+from db import (CatalogValidationError, CsvCatalogStore, NpyCatalogStore, SqliteCatalogStore, import_catalog_rows,
+                read_catalog_rows)
+from benchmarks.workloads import generate_catalog, generate_order, generate_workers
+from system import (EVENT_COMPLETED, NOT_READY, CompiledCatalog, Dispatcher, SimulationResultCache, SkillMatchMatrix,
+                    WorkerSimulationData, assign_tasks, compute_idle_ratio, first_ready_position, resume_simulation,
+                    run_batch, run_dispatch, simulation_cache_key, solve_capacitated_assignment, summarize_result)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WORKERS_DF = pd.read_csv(os.path.join(HERE, "workers.csv"))
+PRODUCTS_DF = pd.read_csv(os.path.join(HERE, "products.csv"))
+ORDER = {"Standing Acrylic T": 4, "Standing Acrylic L": 3, "Brochure Holder size A5": 2}
+
+def assignment_score(scores, assignment):
+    return sum(scores[worker, column] for worker, column in enumerate(assignment) if column >= 0)
+
+class CapacitatedAssignmentTest(unittest.TestCase):
+    def check_feasible(self, scores, capacities, assignment):
+        assigned = assignment[assignment >= 0]
+        self.assertTrue(np.all(np.bincount(assigned, minlength=len(capacities)) <= capacities))
+        self.assertTrue(all(scores[worker, column] > 0 for worker, column in enumerate(assignment) if column >= 0))
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            num_workers, num_columns = rng.integers(1, 5), rng.integers(1, 4)
+            scores = np.round(rng.uniform(-0.5, 2, (num_workers, num_columns)), 1)
+            capacities = rng.integers(0, 3, num_columns)
+            best = 0.0
+            for choice in itertools.product(range(-1, num_columns), repeat=num_workers):
+                choice = np.array(choice)
+                if np.all(np.bincount(choice[choice >= 0], minlength=num_columns) <= capacities):
+                    best = max(best, assignment_score(scores, choice))
+            assignment = solve_capacitated_assignment(scores, capacities)
+            self.check_feasible(scores, capacities, assignment)
+            self.assertAlmostEqual(assignment_score(scores, assignment), best)
+
+    def test_matches_expanded_linear_sum_assignment(self):
+        rng = np.random.default_rng(1)
+        for trial in range(100):
+            num_workers, num_columns = rng.integers(1, 40), rng.integers(1, 150)
+            scores = np.round(rng.uniform(-0.5, 2, (num_workers, num_columns)), 1 + trial % 2)
+            # Single places, few places and more places than workers all take their own path
+            capacities = rng.integers(0, (2, 5, 60)[trial % 3], num_columns)
+            expanded_columns = np.repeat(np.arange(num_columns), capacities)
+            expanded_scores = np.hstack([np.maximum(scores[:, expanded_columns], 0),
+                                         np.zeros((num_workers, num_workers))])
+            rows, positions = linear_sum_assignment(expanded_scores, maximize=True)
+            assignment = solve_capacitated_assignment(scores, capacities)
+            self.check_feasible(scores, capacities, assignment)
+            self.assertAlmostEqual(assignment_score(scores, assignment), expanded_scores[rows, positions].sum())
+
+    def test_empty(self):
+        self.assertEqual(len(solve_capacitated_assignment(np.zeros((3, 0)), [])), 3)
+        self.assertEqual(list(solve_capacitated_assignment(np.ones((2, 2)), [0, 0])), [-1, -1])
+
+def check_schedule(test, task_instances, catalog):
+    """Every unit starts after a unit of each of its requirement groups completed, and no worker
+    works on two units at once"""
+    first_completion = {}
+    for ti in task_instances:
+        if ti.status == "completed":
+            group = catalog.task_group[ti.task_index]
+            first_completion[group] = min(first_completion.get(group, np.inf), ti.completion_time_minutes)
+    for ti in task_instances:
+        for group in catalog.requirement_groups_of(ti.task_index).tolist():
+            test.assertLessEqual(first_completion[group], ti.start_time_minutes)
+    by_worker = {}
+    for ti in task_instances:
+        by_worker.setdefault(ti.assigned_worker_name, []).append((ti.start_time_minutes, ti.completion_time_minutes))
+    for intervals in by_worker.values():
+        intervals.sort()
+        for (_, end), (start, _) in zip(intervals, intervals[1:]):
+            test.assertLessEqual(end, start)
+
+# Schedule of the original app.py (with its completed tasks no longer re-offered per level) for
+# one unit of each product: each worker's units in order, as instance_id@start_minutes
+BASELINE_ORDER = {"Standing Acrylic T": 1, "Standing Acrylic L": 1, "Brochure Holder size A5": 1}
+BASELINE_SCHEDULE = {
+    "Worker Andy": "ST1_U1@0 BH1_U1@30 BH3_U1@60 BH5_U1@90 ST6_U1@120 BH7_U1@150 BH8_U1@180",
+    "Worker Budi": "ST2_U1@0 BH2_U1@30 BH4_U1@60 ST5_U1@90 BH6_U1@120",
+    "Worker Charlie": "SL1_U1@0 ST3_U1@30 ST4_U1@60 SL5_U1@90",
+    "Worker Dodi": "SL2_U1@0 SL3_U1@30 SL4_U1@60",
+}
+
+def worker_schedules(result):
+    units = sorted((ti.assigned_worker_name, ti.start_time_minutes, ti.instance_id) for ti in result["task_instances"])
+    return {worker: " ".join(f"{instance_id}@{start}" for _, start, instance_id in worker_units)
+            for worker, worker_units in itertools.groupby(units, key=lambda unit: unit[0])}
+
+class GreedyAssignmentTest(unittest.TestCase):
+    def test_matches_baseline_schedule(self):
+        for clock_mode in ("tick", "event"):
+            result = assign_tasks(BASELINE_ORDER, WORKERS_DF, PRODUCTS_DF, clock_mode=clock_mode)
+            self.assertTrue(result["all_tasks_completed"])
+            self.assertEqual(result["makespan_minutes"], 210)
+            self.assertEqual(worker_schedules(result), BASELINE_SCHEDULE)
+    
+    def test_event_clock_matches_tick_clock(self):
+        orders = [ORDER, {"Brochure Holder size A5": 6}, {"Standing Acrylic T": 9, "Standing Acrylic L": 7}]
+        for order, assignment_strategy, slot_duration_minutes in itertools.product(orders, ("greedy", "optimal"), (30, 45)):
+            results = [assign_tasks(order, WORKERS_DF, PRODUCTS_DF, slot_duration_minutes=slot_duration_minutes,
+                                    clock_mode=clock_mode, assignment_strategy=assignment_strategy)
+                       for clock_mode in ("tick", "event")]
+            tick, event = [summarize_result(result) for result in results]
+            self.assertEqual(tick, event)
+            np.testing.assert_array_equal(results[0]["schedule"].codes, results[1]["schedule"].codes)
+            check_schedule(self, results[1]["task_instances"], CompiledCatalog(PRODUCTS_DF))
+
+# Inventory the original app.py showed for ORDER at some slots of day 1
+BASELINE_INVENTORY = {
+    0: "None, just started",
+    2: "ST1 4 pcs, ST2 3 pcs, ST3 1 pcs",
+    5: "ST1 4 pcs, ST2 4 pcs, ST3 4 pcs, SL1 3 pcs, SL2 3 pcs, BH1 1 pcs, BH2 1 pcs",
+    9: "ST1 4 pcs, ST2 4 pcs, ST3 4 pcs, SL1 3 pcs, SL2 3 pcs, BH1 2 pcs, BH2 2 pcs, SL3 3 pcs, ST4 2 pcs, "
+       "ST5 1 pcs, SL5 1 pcs, BH3 2 pcs, BH4 1 pcs, ST6 3 pcs, BH5 1 pcs",
+}
+
+class ScheduleInventoryTest(unittest.TestCase):
+    def test_matches_baseline_snapshots(self):
+        for clock_mode in ("tick", "event"):
+            schedule_grid = assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF, clock_mode=clock_mode)["schedule"]
+            for slot, expected in BASELINE_INVENTORY.items():
+                inventory = schedule_grid.inventory_at(1, slot)
+                shown = ", ".join(f"{task_id} {count} pcs" for task_id, count in inventory.items()) or "None, just started"
+                self.assertEqual(shown, expected)
+    
+    def test_matches_completed_units(self):
+        """Every recorded slot holds the units completed up to its start, in both clock modes"""
+        order = {"Standing Acrylic T": 12, "Brochure Holder size A5": 14}
+        for clock_mode in ("tick", "event"):
+            result = assign_tasks(order, WORKERS_DF.iloc[:2], PRODUCTS_DF, slot_duration_minutes=45, clock_mode=clock_mode)
+            schedule_grid = result["schedule"]
+            self.assertGreater(result["estimated_days"], 1)
+            completions = [(ti.completion_time_minutes, ti.task_id) for ti in result["task_instances"]]
+            slots_per_day = schedule_grid.slot_ticks.shape[1]
+            for day, slot in itertools.product(range(1, result["estimated_days"] + 1), range(slots_per_day)):
+                inventory = schedule_grid.inventory_at(day, slot)
+                if schedule_grid.slot_ticks[day - 1, slot] < 0:
+                    self.assertIsNone(inventory)
+                    continue
+                slot_minutes = schedule_grid.slot_ticks[day - 1, slot] * 45
+                expected = {}
+                for completion_minutes, task_id in completions:
+                    if completion_minutes <= slot_minutes:
+                        expected[task_id] = expected.get(task_id, 0) + 1
+                self.assertEqual(inventory, expected)
+
+class SimulationLogTest(unittest.TestCase):
+    def run_order(self, **options):
+        return assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF, **options)
+    
+    def test_verbosity_does_not_change_assignments(self):
+        full = self.run_order()
+        num_units = len(full["task_instances"])
+        self.assertEqual(len(full["simulation_log"]), 2 * num_units)
+        for log_verbosity, num_events in (("summary", num_units), ("off", 0)):
+            result = self.run_order(log_verbosity=log_verbosity)
+            self.assertEqual(summarize_result(result), summarize_result(full))
+            self.assertEqual(len(result["simulation_log"]), num_events)
+        summary_events = list(self.run_order(log_verbosity="summary")["simulation_log"])
+        self.assertEqual(summary_events, [event for event in full["simulation_log"] if event[4] == EVENT_COMPLETED])
+        self.assertTrue(self.run_order(log_verbosity="off")["simulation_log"].to_dataframe().empty)
+        with self.assertRaises(ValueError):
+            self.run_order(log_verbosity="verbose")
+    
+    def test_ring_buffer_keeps_last_events(self):
+        full = self.run_order()
+        for log_max_events in (1, 7, 10 ** 6):
+            result = self.run_order(log_max_events=log_max_events)
+            self.assertEqual(summarize_result(result), summarize_result(full))
+            self.assertEqual(list(result["simulation_log"]), list(full["simulation_log"])[-log_max_events:])
+        tail = self.run_order(log_max_events=7)["simulation_log"].to_dataframe()
+        pd.testing.assert_frame_equal(tail, full["simulation_log"].to_dataframe().tail(7).reset_index(drop=True))
+
+class FallbackRankingTest(unittest.TestCase):
+    def setUp(self):
+        self.products_df = generate_catalog(num_products=30, tasks_per_product=6, interchangeable_products=3, seed=2)
+        self.workers_df = generate_workers(40, self.products_df["Product"].unique(), seed=2)
+    
+    def test_preferences_rank_by_score(self):
+        catalog = CompiledCatalog(self.products_df)
+        workers = [WorkerSimulationData(row) for _, row in self.workers_df.iterrows()]
+        for worker_idx, worker in enumerate(workers):
+            worker.worker_index = worker_idx
+        skill_matrix = SkillMatchMatrix(workers, catalog)
+        for worker_idx in range(len(workers)):
+            ranked_types, tie_end = skill_matrix.preferences(worker_idx)
+            scores = skill_matrix.assignment_score[worker_idx, ranked_types]
+            self.assertEqual(sorted(ranked_types), list(range(len(catalog.task_group))))
+            self.assertTrue(np.all(np.diff(scores) <= 0))
+            for position in range(len(ranked_types)):
+                self.assertTrue(np.all(scores[position:tie_end[position]] == scores[position]))
+                if tie_end[position] < len(ranked_types):
+                    self.assertLess(scores[tie_end[position]], scores[position])
+    
+    def test_first_ready_position(self):
+        rng = np.random.default_rng(3)
+        for num_ready in (1, 2, 20, 200):
+            ranked_types = rng.permutation(200)
+            ready_heads = np.full(200, NOT_READY)
+            ready_heads[rng.choice(200, num_ready, replace=False)] = rng.integers(0, 1000, num_ready)
+            expected = next(position for position, task_type in enumerate(ranked_types)
+                            if ready_heads[task_type] != NOT_READY)
+            self.assertEqual(first_ready_position(ranked_types, ready_heads), expected)
+    
+    def test_fallback_schedules(self):
+        order = generate_order(self.products_df, 3)
+        results = [assign_tasks(order, self.workers_df, self.products_df, clock_mode=clock_mode, profile=True)
+                   for clock_mode in ("tick", "event")]
+        self.assertGreater(results[1]["profile"]["counters"]["fallback_assignments"], 0)
+        self.assertEqual(summarize_result(results[0]), summarize_result(results[1]))
+        check_schedule(self, results[1]["task_instances"], CompiledCatalog(self.products_df))
+
+class ResumeSimulationTest(unittest.TestCase):
+    def test_resume_without_change_reproduces_full_run(self):
+        for assignment_strategy in ("greedy", "optimal"):
+            full = assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF, assignment_strategy=assignment_strategy)
+            for checkpoint_minutes in (0, 90, full["makespan_minutes"] // 2, full["makespan_minutes"]):
+                checkpoint = assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF, assignment_strategy=assignment_strategy,
+                                          checkpoint_minutes=checkpoint_minutes)["checkpoint"]
+                resumed = resume_simulation(checkpoint)
+                self.assertEqual(summarize_result(resumed), summarize_result(full))
+                self.assertEqual(resumed["simulation_log"].to_dataframe().values.tolist(),
+                                 full["simulation_log"].to_dataframe().values.tolist())
+    
+    def test_rejects_invalid_order_delta(self):
+        checkpoint = assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF, checkpoint_minutes=60)["checkpoint"]
+        for order_delta in ({"Standing Acrylic T": 2.5}, {"Standing Acrylic T": "2"}, {"Standing Acrylic T": True},
+                            {"Unknown product": 1}):
+            with self.assertRaises(ValueError):
+                resume_simulation(checkpoint, order_delta=order_delta)
+        full = assign_tasks(dict(ORDER, **{"Standing Acrylic T": 6}), WORKERS_DF, PRODUCTS_DF, checkpoint_minutes=0)
+        resumed = summarize_result(resume_simulation(full["checkpoint"], order_delta={"Standing Acrylic T": -2.0}))
+        expected = summarize_result(assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF))
+        # The horizon planned for the larger order is kept
+        self.assertEqual(dict(resumed, estimated_days=None), dict(expected, estimated_days=None))
+    
+    def test_idle_ratio_counts_every_presence_window(self):
+        leaving_name = WORKERS_DF["Worker"].iloc[0]
+        checkpoint = assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF, checkpoint_minutes=60)["checkpoint"]
+        away = resume_simulation(checkpoint, available_workers_df=WORKERS_DF.iloc[1:], checkpoint_minutes=150)
+        back = resume_simulation(away["checkpoint"], available_workers_df=WORKERS_DF)
+        horizon_minutes = back["makespan_minutes"]
+        self.assertGreater(horizon_minutes, 150)
+        self.assertEqual(back["worker_sim_data_map"][leaving_name].present_minutes(horizon_minutes),
+                         horizon_minutes - 90)
+        busy_minutes = sum(ti.completion_time_minutes - ti.start_time_minutes for ti in back["task_instances"])
+        available_minutes = horizon_minutes * len(WORKERS_DF) - 90
+        self.assertAlmostEqual(compute_idle_ratio(back), 1 - busy_minutes / available_minutes)
+    
+    def test_dispatcher_presence_windows(self):
+        dispatcher = Dispatcher(ORDER, WORKERS_DF, CompiledCatalog(PRODUCTS_DF))
+        dispatcher.start()
+        worker_name = dispatcher.workers[0].name
+        dispatcher.leave(worker_name, 30)
+        dispatcher.join({"Worker": worker_name}, 100)
+        self.assertEqual(dispatcher.worker_sim_data_map[worker_name].present_minutes(160), 90)
+
+class SimulationResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = temp_dir.name
+    
+    def cached_files(self):
+        return sorted(name for name in os.listdir(self.cache_dir) if name.endswith(".pkl"))
+    
+    def test_lru_eviction(self):
+        cache = SimulationResultCache(max_entries=2)
+        cache.put("a", {"run": "a"})
+        cache.put("b", {"run": "b"})
+        self.assertEqual(cache.get("a"), {"run": "a"})
+        cache.put("c", {"run": "c"})
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"run": "a"})
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+    
+    def test_disk_round_trip(self):
+        result = assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF)
+        key = simulation_cache_key(ORDER, WORKERS_DF, PRODUCTS_DF)
+        SimulationResultCache(cache_dir=self.cache_dir).put(key, result)
+        restarted = SimulationResultCache(cache_dir=self.cache_dir)
+        calls = []
+        cached = restarted.get_or_run(key, lambda: calls.append(key))
+        self.assertEqual(calls, [])
+        self.assertEqual(summarize_result(cached), summarize_result(result))
+    
+    def test_disk_tier_is_bounded(self):
+        cache = SimulationResultCache(max_entries=1, cache_dir=self.cache_dir, max_disk_entries=3, max_disk_bytes=None)
+        for index, key in enumerate("abcd"):
+            cache.put(key, {"run": key})
+            # Distinct modification times, oldest first, whatever the file system's resolution
+            os.utime(os.path.join(self.cache_dir, f"{key}.pkl"), ns=(index * 10 ** 9, index * 10 ** 9))
+        cache.put("e", {"run": "e"})
+        self.assertEqual(self.cached_files(), ["c.pkl", "d.pkl", "e.pkl"])
+        
+        file_bytes = os.path.getsize(os.path.join(self.cache_dir, "e.pkl"))
+        cache = SimulationResultCache(max_entries=1, cache_dir=self.cache_dir, max_disk_entries=None,
+                                      max_disk_bytes=2 * file_bytes)
+        cache.put("f", {"run": "f"})
+        self.assertEqual(len(self.cached_files()), 2)
+        self.assertIn("f.pkl", self.cached_files())
+    
+    def test_key_covers_every_input(self):
+        key = simulation_cache_key(ORDER, WORKERS_DF, PRODUCTS_DF)
+        self.assertEqual(simulation_cache_key(dict(reversed(ORDER.items())), WORKERS_DF.copy(), PRODUCTS_DF.copy()), key)
+        changed_products = PRODUCTS_DF.copy()
+        changed_products.loc[0, "DurationSlot"] = 2
+        changed_workers = WORKERS_DF.copy()
+        changed_workers.loc[0, "Bending"] = 0.1
+        variants = [
+            simulation_cache_key(dict(ORDER, **{"Standing Acrylic T": 5}), WORKERS_DF, PRODUCTS_DF),
+            simulation_cache_key(ORDER, WORKERS_DF.iloc[1:], PRODUCTS_DF),
+            simulation_cache_key(ORDER, changed_workers, PRODUCTS_DF),
+            simulation_cache_key(ORDER, WORKERS_DF, changed_products),
+            simulation_cache_key(ORDER, WORKERS_DF, PRODUCTS_DF, slot_duration_minutes=45),
+            simulation_cache_key(ORDER, WORKERS_DF, PRODUCTS_DF, seed=1),
+            simulation_cache_key(ORDER, WORKERS_DF, PRODUCTS_DF, assignment_strategy="optimal"),
+        ]
+        self.assertEqual(len(set(variants + [key])), len(variants) + 1)
+
+def run_lines(runner, requests):
+    output = io.StringIO()
+    failures = runner(io.StringIO("".join(json.dumps(request) + "\n" for request in requests)), output,
+                      WORKERS_DF, PRODUCTS_DF)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    return failures, responses
+
+class BatchRequestTest(unittest.TestCase):
+    def test_rejects_invalid_requests(self):
+        valid = {"products_to_produce": {"Standing Acrylic T": 2}, "slot_duration_minutes": 30}
+        invalid_requests = [
+            {"products_to_produce": {"Standing Acrylic T": 2}},
+            dict(valid, slot_duration_minutes=0),
+            dict(valid, slot_duration_minutes=-30),
+            dict(valid, slot_duration_minutes=2.5),
+            dict(valid, slot_duration_minutes="30"),
+            dict(valid, products_to_produce={"Standing Acrylic T": 2.5}),
+            dict(valid, products_to_produce={"Standing Acrylic T": -2}),
+            dict(valid, products_to_produce={"Unknown product": 2}),
+            dict(valid, workers=["Nobody"]),
+        ]
+        failures, responses = run_lines(run_batch, invalid_requests + [valid])
+        self.assertEqual(failures, len(invalid_requests))
+        self.assertEqual([response["ok"] for response in responses], [False] * len(invalid_requests) + [True])
+        self.assertTrue(all(response["error"] for response in responses[:-1]))
+    
+    def test_whole_floats_and_zero_quantities(self):
+        requests = [
+            {"products_to_produce": {"Standing Acrylic T": 2, "Standing Acrylic L": 0}, "slot_duration_minutes": 30},
+            {"products_to_produce": {"Standing Acrylic T": 2.0}, "slot_duration_minutes": 30.0},
+        ]
+        failures, responses = run_lines(run_batch, requests)
+        self.assertEqual(failures, 0)
+        self.assertEqual(responses[0]["makespan_minutes"], responses[1]["makespan_minutes"])
+
+class DispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = CompiledCatalog(PRODUCTS_DF)
+        self.dispatcher = Dispatcher(ORDER, WORKERS_DF, self.catalog)
+        self.running = []
+    
+    def track(self, assignments):
+        for assignment in assignments:
+            heapq.heappush(self.running, (assignment["expected_completion_minutes"], assignment["worker"],
+                                          assignment["instance_id"]))
+    
+    def run_to_end(self):
+        while self.running:
+            time_minutes, worker_name, instance_id = heapq.heappop(self.running)
+            # Units given up by a worker who left are not completed
+            current_task = self.dispatcher.worker_sim_data_map[worker_name].current_task_instance
+            if current_task is not None and current_task.instance_id == instance_id:
+                self.track(self.dispatcher.complete(worker_name, instance_id, time_minutes))
+    
+    def snapshot(self):
+        dispatcher = self.dispatcher
+        return (dispatcher.status(), len(dispatcher.workers), dispatcher.skill_matrix.assignment_score.shape,
+                dispatcher.rng.bit_generator.state)
+    
+    def test_completes_order(self):
+        self.track(self.dispatcher.start())
+        self.run_to_end()
+        self.assertTrue(self.dispatcher.finished)
+        task_instances = self.dispatcher.ready_tracker.started_instances
+        self.assertEqual(sum(ti.status == "completed" for ti in task_instances), self.dispatcher.ready_tracker.total_units)
+        check_schedule(self, task_instances, self.catalog)
+    
+    def test_leave_and_join(self):
+        self.track(self.dispatcher.start())
+        leaving = self.dispatcher.workers[0]
+        unit = leaving.current_task_instance
+        self.track(self.dispatcher.leave(leaving.name, 10))
+        self.assertEqual(unit.status, "interrupted")
+        self.assertIn(leaving.name, self.dispatcher.status()["absent"])
+        new_worker = dict(WORKERS_DF.iloc[1], Worker="Worker New")
+        self.track(self.dispatcher.join(new_worker, 20))
+        self.track(self.dispatcher.join({"Worker": leaving.name}, 40))
+        self.assertEqual(self.dispatcher.skill_matrix.assignment_score.shape[0], len(self.dispatcher.workers))
+        self.run_to_end()
+        self.assertTrue(self.dispatcher.finished)
+        check_schedule(self, self.dispatcher.ready_tracker.started_instances, self.catalog)
+    
+    def test_run_dispatch_validates_events(self):
+        start = {"event": "start", "products_to_produce": {"Standing Acrylic T": 2}, "slot_duration_minutes": 30}
+        events = [
+            dict(start, slot_duration_minutes=None),
+            dict(start, slot_duration_minutes=0),
+            dict(start, slot_duration_minutes=2.5),
+            dict(start, products_to_produce={"Standing Acrylic T": -1}),
+            start,
+            {"event": "status"},
+            {"event": "order", "products_delta": {"Standing Acrylic T": 0.5}},
+            {"event": "order", "products_delta": {"Standing Acrylic T": -1}},
+            {"event": "status"},
+        ]
+        failures, responses = run_lines(run_dispatch, events)
+        self.assertEqual(failures, 5)
+        self.assertEqual([response["ok"] for response in responses], [False] * 4 + [True, True, False, True, True])
+        self.assertLess(responses[-1]["total_units"], responses[5]["total_units"])
+    
+    def test_failed_events_leave_state_unchanged(self):
+        self.track(self.dispatcher.start())
+        worker = self.dispatcher.workers[0]
+        before = self.snapshot()
+        failing_events = [
+            lambda: self.dispatcher.join(dict(WORKERS_DF.iloc[0], Worker="Worker New", Bending="abc"), 30),
+            lambda: self.dispatcher.join({"Worker": worker.name}, 30),
+            lambda: self.dispatcher.join(dict(WORKERS_DF.iloc[0], Worker="Worker New"), "30"),
+            lambda: self.dispatcher.join(dict(WORKERS_DF.iloc[0], Worker="Worker New"), True),
+            lambda: self.dispatcher.complete(worker.name, worker.current_task_instance.instance_id, "30"),
+            lambda: self.dispatcher.leave(worker.name, float("nan")),
+            lambda: self.dispatcher.complete(worker.name, "XX_U1", 30),
+            lambda: self.dispatcher.complete("Nobody", None, 30),
+            lambda: self.dispatcher.leave("Nobody", 30),
+            lambda: self.dispatcher.change_order({"Unknown product": 1}, 30),
+        ]
+        for event in failing_events:
+            with self.assertRaises(ValueError):
+                event()
+            self.assertEqual(self.snapshot(), before)
+        # A corrected retry goes through
+        self.track(self.dispatcher.join(dict(WORKERS_DF.iloc[0], Worker="Worker New"), 30))
+        self.assertEqual(self.dispatcher.workers[-1].worker_index, self.dispatcher.skill_matrix.assignment_score.shape[0] - 1)
+        self.run_to_end()
+        self.assertTrue(self.dispatcher.finished)
+
+class CatalogStoreTests:
+    """Round trips shared by every catalog store; subclasses implement make_store(directory)"""
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.directory = temp_dir.name
+        self.store = self.make_store(self.directory)
+        self.store.import_csv(os.path.join(HERE, "workers.csv"), os.path.join(HERE, "products.csv"))
+    
+    def test_csv_round_trip(self):
+        workers_path, products_path = (os.path.join(self.directory, name) for name in ("w.csv", "p.csv"))
+        self.store.export_csv(workers_path, products_path)
+        pd.testing.assert_frame_equal(pd.read_csv(workers_path), WORKERS_DF)
+        pd.testing.assert_frame_equal(pd.read_csv(products_path), PRODUCTS_DF)
+    
+    def test_loaded_catalog_schedules_like_csv(self):
+        expected = summarize_result(assign_tasks(ORDER, WORKERS_DF, PRODUCTS_DF))
+        result = assign_tasks(ORDER, self.store.load_workers(), self.store.load_products())
+        self.assertEqual(summarize_result(result), expected)
+    
+    def test_row_writes(self):
+        version = self.store.version("workers")
+        new_worker = dict(WORKERS_DF.iloc[0], Worker="Worker New")
+        self.store.insert("workers", new_worker)
+        self.assertNotEqual(self.store.version("workers"), version)
+        self.assertTrue(self.store.update("workers", "Worker New", {"Bending": 0.25}))
+        self.assertFalse(self.store.update("workers", "Nobody", {"Bending": 0.25}))
+        workers = self.store.load_workers()
+        self.assertEqual(list(workers["Worker"]), list(WORKERS_DF["Worker"]) + ["Worker New"])
+        self.assertEqual(float(workers["Bending"].iloc[-1]), 0.25)
+        self.assertEqual(float(workers["Gluing"].iloc[-1]), float(WORKERS_DF["Gluing"].iloc[0]))
+        
+        self.assertTrue(self.store.delete("workers", "Worker New"))
+        self.assertFalse(self.store.delete("workers", "Worker New"))
+        export_path = os.path.join(self.directory, "w.csv")
+        self.store.load_workers().to_csv(export_path, index=False)
+        pd.testing.assert_frame_equal(pd.read_csv(export_path), WORKERS_DF)
+    
+    def test_insert_many(self):
+        new_workers = WORKERS_DF.assign(Worker=WORKERS_DF["Worker"] + " 2")
+        self.store.insert_many("workers", new_workers)
+        self.assertEqual(list(self.store.load_workers()["Worker"]),
+                         list(WORKERS_DF["Worker"]) + list(new_workers["Worker"]))
+
+class CsvCatalogStoreTest(CatalogStoreTests, unittest.TestCase):
+    def make_store(self, directory):
+        return CsvCatalogStore(os.path.join(directory, "workers.csv"), os.path.join(directory, "products.csv"))
+
+class SqliteCatalogStoreTest(CatalogStoreTests, unittest.TestCase):
+    def make_store(self, directory):
+        return SqliteCatalogStore(os.path.join(directory, "catalog.db"))
+    
+    def test_store_reopens(self):
+        reopened = SqliteCatalogStore(self.store.path)
+        self.assertEqual(reopened.version("products"), self.store.version("products"))
+        self.assertEqual(len(reopened.load_products()), len(PRODUCTS_DF))
+
+class NpyCatalogStoreTest(CatalogStoreTests, unittest.TestCase):
+    def make_store(self, directory):
+        return NpyCatalogStore(os.path.join(directory, "catalog"))
+    
+    def test_frames_loaded_before_a_write_stay_readable(self):
+        workers = self.store.load_workers()
+        self.store.delete("workers", WORKERS_DF["Worker"].iloc[0])
+        self.assertEqual(list(workers["Worker"]), list(WORKERS_DF["Worker"]))
+        generations = [entry for entry in os.listdir(self.store.directory) if entry.startswith("workers-")]
+        self.assertEqual(generations, [f"workers-{self.store.version('workers')}"])
+
+class CatalogImportTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.directory = temp_dir.name
+        self.store = SqliteCatalogStore(os.path.join(self.directory, "catalog.db"))
+        self.store.import_csv(os.path.join(HERE, "workers.csv"), os.path.join(HERE, "products.csv"))
+    
+    def test_imports_valid_rows(self):
+        rows_path = os.path.join(self.directory, "new_workers.jsonl")
+        new_workers = WORKERS_DF.assign(Worker=" " + WORKERS_DF["Worker"] + " 2 ")
+        new_workers.to_json(rows_path, orient="records", lines=True)
+        self.assertEqual(import_catalog_rows(self.store, "workers", read_catalog_rows(rows_path)), len(WORKERS_DF))
+        workers = self.store.load_workers()
+        self.assertEqual(list(workers["Worker"]), list(WORKERS_DF["Worker"]) + list(WORKERS_DF["Worker"] + " 2"))
+    
+    def test_new_task_may_require_a_task_of_the_same_batch(self):
+        first = dict(PRODUCTS_DF.iloc[0], Product="New product", Result="NP1", Requirements=None)
+        second = dict(first, Result="NP2", Requirements="NP1")
+        self.assertEqual(import_catalog_rows(self.store, "products", pd.DataFrame([first, second])), 2)
+        self.assertIn("NP2", set(self.store.load_products()["Result"]))
+    
+    def test_rejects_the_whole_batch(self):
+        version = self.store.version("products")
+        valid = dict(PRODUCTS_DF.iloc[0], Product="New product", Result="NP1", Requirements=None)
+        rows = pd.DataFrame([
+            valid,
+            dict(valid, Result=PRODUCTS_DF["Result"].iloc[0]),
+            dict(valid, Result="NP2", Bending=150),
+            dict(valid, Result="NP3", DurationSlot=0.5),
+            dict(valid, Result="NP4", Requirements="XX9"),
+            dict(valid, Result="NP1", Gluing="abc"),
+        ])
+        with self.assertRaises(CatalogValidationError) as raised:
+            import_catalog_rows(self.store, "products", rows)
+        self.assertEqual(len(raised.exception.errors), 6)
+        self.assertEqual(self.store.version("products"), version)
+        self.assertEqual(len(self.store.load_products()), len(PRODUCTS_DF))
+    
+    def test_rejects_unknown_and_missing_columns(self):
+        with self.assertRaises(CatalogValidationError) as raised:
+            import_catalog_rows(self.store, "workers", pd.DataFrame([{"Worker": "Worker New", "Speed": 1}]))
+        self.assertEqual([error.split(":")[0] for error in raised.exception.errors], ["Unknown columns", "Missing columns"])
+
+if __name__ == "__main__":
+    unittest.main()